@@ -5,6 +5,12 @@ from quart import Quart, jsonify
 from dotenv import load_dotenv
 from werkzeug.exceptions import HTTPException
 from backend.app.register_blueprints import register_blueprints
+from backend.services.browser_pool import browser_pool
+from backend.services.url_index import url_index
+from backend.services.simhash_index import simhash_index
+from backend.services.vector_index import vector_index
+from backend.services.http_client import close_http_client
+from backend.services.page_cache import page_cache
 
 
 def create_app() -> Quart:
@@ -30,7 +36,22 @@ def create_app() -> Quart:
 
     @app.before_serving
     async def init_db():
-        pass
+        try:
+            await url_index.warm()
+        except Exception:
+            app.logger.exception("Could not warm URL index; it will warm on first scrape")
+        try:
+            await simhash_index.warm()
+        except Exception:
+            app.logger.exception("Could not warm SimHash index; it will warm on first insert")
+        # Semantic lookups use pgvector until this finishes, so it need not block startup.
+        vector_index.kick_warm()
+
+    @app.after_serving
+    async def close_browser_pool():
+        await browser_pool.close()
+        await close_http_client()
+        page_cache.flush()
 
     register_blueprints(app)
     return app
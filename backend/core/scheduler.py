@@ -0,0 +1,171 @@
+# core/scheduler.py
+from __future__ import annotations
+
+import asyncio
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import text
+
+from backend.db.session import SessionLocal
+from backend.pipelines.graphs.web_scrapper_graph.sources import resolve_source
+from backend.utils.helpers import utcnow
+
+# How often the scheduler wakes up to look for due sources.
+SCHEDULER_TICK_S = int(os.getenv("SCHEDULER_TICK_S", "30"))
+# Bounds for the adaptive per-source polling interval.
+SCHEDULER_MIN_INTERVAL_S = int(os.getenv("SCHEDULER_MIN_INTERVAL_S", "120"))
+SCHEDULER_MAX_INTERVAL_S = int(os.getenv("SCHEDULER_MAX_INTERVAL_S", "3600"))
+# A run storing at least this many new articles counts as busy.
+BUSY_YIELD = 3
+SPEEDUP = 0.5
+BACKOFF = 1.5
+# Smoothing for sources.articles_per_day.
+RATE_ALPHA = 0.3
+
+# Used only while the sources table is empty.
+DEFAULT_SOURCES = [
+    "https://www.cnbc.com/id/100003114/device/rss/rss.html",
+    "https://www.reuters.com/world/",
+]
+
+
+@dataclass
+class _SourceState:
+    url: str
+    id: Optional[str] = None
+    interval: float = 600
+    next_run: datetime = field(default_factory=utcnow)
+    last_update: Optional[datetime] = None
+    articles_per_day: Optional[float] = None
+    running: bool = False
+
+
+class CrawlScheduler:
+    """
+    Polls enabled rows of `sources` concurrently. Each source's interval starts
+    at its adapter's poll_interval and adapts to how many new articles it stores.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._sources: Dict[str, _SourceState] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def close(self) -> None:
+        """Cancel in-flight crawls (app shutdown)."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _load_sources(self) -> List[dict]:
+        async with SessionLocal() as session:
+            rows = (
+                await session.execute(
+                    text(
+                        """
+                        SELECT id, url, last_update, articles_per_day, enabled
+                        FROM sources
+                        """
+                    )
+                )
+            ).mappings().all()
+        if not rows:
+            return [{"id": None, "url": u, "last_update": None, "articles_per_day": None}
+                    for u in DEFAULT_SOURCES]
+        return [dict(r) for r in rows if r["enabled"]]
+
+    def _sync(self, rows: List[dict]) -> None:
+        seen = set()
+        for row in rows:
+            url = row["url"]
+            adapter = resolve_source(url)
+            if adapter is None:
+                continue
+            seen.add(url)
+            st = self._sources.get(url)
+            if st is None:
+                st = _SourceState(url=url, interval=adapter.poll_interval)
+                if row["last_update"]:
+                    st.next_run = row["last_update"] + timedelta(seconds=st.interval)
+                self._sources[url] = st
+            st.id = str(row["id"]) if row["id"] else None
+            st.last_update = st.last_update or row["last_update"]
+            if st.articles_per_day is None and row["articles_per_day"] is not None:
+                st.articles_per_day = float(row["articles_per_day"])
+        # Disabled or deleted sources stop being polled (in-flight runs finish).
+        for url in list(self._sources):
+            if url not in seen and not self._sources[url].running:
+                del self._sources[url]
+
+    async def tick(self) -> None:
+        self._sync(await self._load_sources())
+        now = utcnow()
+        for st in self._sources.values():
+            if st.running or st.next_run > now:
+                continue
+            st.running = True
+            task = asyncio.create_task(self._run(st))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, st: _SourceState) -> None:
+        started = utcnow()
+        new_count = 0
+        try:
+            result = await self.graph.ainvoke({"link": st.url})
+            # Listing entries filtered as seen or duplicates do not make a source busy.
+            new_count = len(result.get("inserted_urls") or [])
+        except Exception as e:
+            print(f"Scheduler: run failed for {st.url}: {e}")
+        finally:
+            self._adapt(st, new_count)
+            st.next_run = utcnow() + timedelta(seconds=st.interval)
+            st.running = False
+
+        await self._record(st, started, new_count)
+        print(
+            f"Scheduler: {st.url} stored {new_count} new articles, "
+            f"next run in {int(st.interval)}s"
+        )
+
+    def _adapt(self, st: _SourceState, new_count: int) -> None:
+        if new_count >= BUSY_YIELD:
+            st.interval *= SPEEDUP
+        elif new_count == 0:
+            st.interval *= BACKOFF
+        st.interval = max(SCHEDULER_MIN_INTERVAL_S, min(SCHEDULER_MAX_INTERVAL_S, st.interval))
+
+    async def _record(self, st: _SourceState, started: datetime, new_count: int) -> None:
+        prev = st.last_update
+        elapsed = (started - prev).total_seconds() if prev else st.interval
+        observed = new_count * 86400.0 / max(elapsed, 1.0)
+        st.articles_per_day = (
+            observed
+            if st.articles_per_day is None
+            else RATE_ALPHA * observed + (1 - RATE_ALPHA) * st.articles_per_day
+        )
+        st.last_update = started
+        if st.id is None:
+            return
+        try:
+            async with SessionLocal() as session:
+                await session.execute(
+                    text(
+                        """
+                        UPDATE sources
+                        SET last_update = :last_update, articles_per_day = :articles_per_day
+                        WHERE id = :id
+                        """
+                    ),
+                    {
+                        "id": st.id,
+                        "last_update": started,
+                        "articles_per_day": round(st.articles_per_day, 2),
+                    },
+                )
+                await session.commit()
+        except Exception as e:
+            print(f"Scheduler: could not update source {st.url}: {e}")
@@ -3,18 +3,20 @@ from __future__ import annotations
 from datetime import timedelta
 from quart_tasks import QuartTasks
 from pipelines.graphs.graph import graph
+from backend.core.scheduler import CrawlScheduler, SCHEDULER_TICK_S
 
 
 def register_tasks(app):
     tasks = QuartTasks(app)
+    scheduler = CrawlScheduler(graph)
 
-    @tasks.periodic(timedelta(seconds=600))
+    # Every source has its own adaptive interval; the tick only starts the due ones.
+    @tasks.periodic(timedelta(seconds=SCHEDULER_TICK_S))
     async def schedule():
-        sources = [
-            "https://www.cnbc.com/id/100003114/device/rss/rss.html",
-            "https://www.reuters.com/world/",
-        ]
-        for source in sources:
-            await graph.ainvoke({"link": source})
+        await scheduler.tick()
+
+    @app.after_serving
+    async def stop_scheduler():
+        await scheduler.close()
 
     return tasks
@@ -1,6 +1,6 @@
 from sqlalchemy import Column, String, DateTime, Numeric, Boolean, ForeignKey, Integer
 from sqlalchemy import Column, Integer, String, Float, Boolean, JSON, ARRAY
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.orm import declarative_base, deferred, relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from sqlalchemy import Column, String, Float, ForeignKey, Integer
@@ -27,7 +27,8 @@ class Article(Base):
     )
     lang = Column(String, nullable=True)
     hash_64 = Column(Numeric, nullable=True)
-    content_emb = Column(Vector1536)
+    # Only loaded when asked for (undefer / explicit column): 1536 floats per row.
+    content_emb = deferred(Column(Vector1536))
     provider = Column(String, nullable=True)
     image_url = Column(String, nullable=True)
 
@@ -54,6 +55,8 @@ class ArticleAnalysis(Base):
     citations = Column(JSON)
     important = Column(Boolean, default=False)
     markets = Column(ARRAY(String))
+    # Time of the last (re-)analysis; a semantic duplicate refreshes the packet once it is old enough.
+    analysed_at = Column(DateTime(timezone=True), nullable=True, default=utcnow)
 
 
 class Account(Base):
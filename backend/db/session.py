@@ -1,8 +1,11 @@
 import os
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 from dotenv import load_dotenv
 
+from backend.db.types import VECTOR_CODECS, plain_vector_params
+
 load_dotenv()
 DATABASE_URL = os.environ["DATABASE_URL"]
 
@@ -10,4 +13,32 @@ engine = create_async_engine(DATABASE_URL, pool_pre_ping=True)
 SessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
     engine, expire_on_commit=False
 )
-AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
\ No newline at end of file
+AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _register_vector(dbapi_connection, connection_record):
+    # pgvector's codecs: numpy arrays in and out. asyncpg uses the binary format both
+    # ways; psycopg still returns text unless a binary cursor is used (pgvector parses it).
+    try:
+        if engine.dialect.driver == "asyncpg":
+            from pgvector.asyncpg import register_vector
+        else:
+            from pgvector.psycopg import register_vector_async as register_vector
+        dbapi_connection.run_async(register_vector)
+    except ImportError:
+        return
+    except Exception as e:
+        print(f"pgvector codecs not registered on this connection, using text vectors: {e}")
+        return
+    connection_record.info[VECTOR_CODECS] = True
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute", retval=True)
+def _vector_params(conn, cursor, statement, parameters, context, executemany):
+    # Codec registration is per connection: only those that have it may receive arrays.
+    if conn.info.get(VECTOR_CODECS):
+        return statement, parameters
+    if executemany:
+        return statement, [plain_vector_params(p) for p in parameters]
+    return statement, plain_vector_params(parameters)
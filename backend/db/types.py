@@ -1,5 +1,31 @@
 from sqlalchemy.types import UserDefinedType
-import json
+import numpy as np
+
+
+# connection_record.info key set by db/session.py on connections where pgvector's
+# codecs were registered; other connections get vectors as plain float lists.
+VECTOR_CODECS = "pgvector_codecs"
+
+
+def plain_vector_params(parameters):
+    """Driver parameters with numpy vectors turned into lists (connection without codecs)."""
+    if isinstance(parameters, dict):
+        return {k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return type(parameters)(v.tolist() if isinstance(v, np.ndarray) else v for v in parameters)
+    return parameters
+
+
+def to_vector(value) -> np.ndarray:
+    """float32 array from whatever the driver returned (ndarray, pgvector.Vector, text literal, list)."""
+    if isinstance(value, np.ndarray):
+        return value.astype(np.float32, copy=False)
+    if isinstance(value, str):
+        # Text format "[0.1,0.2,...]" when no binary codec is registered.
+        return np.array(value.strip("[]").split(","), dtype=np.float32)
+    if hasattr(value, "to_numpy"):
+        return value.to_numpy().astype(np.float32, copy=False)
+    return np.asarray(value, dtype=np.float32)
 
 
 class Vector1536(UserDefinedType):
@@ -10,17 +36,15 @@ class Vector1536(UserDefinedType):
 
     def bind_processor(self, dialect):
         def process(value):
-            # pgvector expects a Python list/tuple of floats
-            return None if value is None else list(value)
+            if value is None:
+                return None
+            # Connections without pgvector's codecs get a list instead (see db/session.py).
+            return to_vector(value)
 
         return process
 
     def result_processor(self, dialect, coltype):
         def process(value):
-            # The value from the DB is a string like "[0.1, 0.2, ...]"
-            # We need to parse it into a list of floats.
-            if value is None:
-                return None
-            return json.loads(value)
+            return None if value is None else to_vector(value)
 
         return process
@@ -8,10 +8,13 @@ from langchain_openai import ChatOpenAI
 
 from langchain_core.messages import HumanMessage
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
 
 from dotenv import load_dotenv
 
 from backend.utils.helpers import extract_text_inside_tags
+from backend.services.llm import chat_model, estimate_tokens, llm
+from backend.services.llm_cache import cache_spec
 
 import asyncio
 import base64
@@ -82,45 +85,48 @@ Example:
 """
 
 
-def entity_extraction(state: InputState) -> OverallState:
-    model = ChatOpenAI(model="gpt-4o")
+# Cached responses are the parsed list, so a malformed answer is never stored and replayed.
+EXTRACTION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_PROMPT),
+    ("human", "{article}"),
+])
+
+
+def _parse_answer(message) -> Any:
+    answer = extract_text_inside_tags(message.content, "answer")
+    if not answer or len(answer.strip()) == 0:
+        return None
+    try:
+        return json.loads(answer)
+    except json.JSONDecodeError as je:
+        raise ValueError(f"Failed to parse JSON from answer: {je}")
+
+
+async def entity_extraction(state: InputState) -> OverallState:
+    if state.get("entities_news") is not None:
+        # Already produced by the single-pass news analysis.
+        return {}
+    model = chat_model("gpt-4o")
+    article_text = (
+        state["unstructured_article"]
+        if isinstance(state["unstructured_article"], str)
+        else json.dumps(state["unstructured_article"], ensure_ascii=False)
+    )
+    chain = EXTRACTION_PROMPT | model | RunnableLambda(_parse_answer)
     for attempt in range(1, MAX_ATTEMPTS + 1):
         try:
-            # article_parsed = asyncio.run(get_news_text(state["article"]["link"]))
-            # state["article"]["main_text"] = article_parsed
-            article_text = (
-                state["unstructured_article"]
-                if isinstance(state["unstructured_article"], str)
-                else json.dumps(state["unstructured_article"], ensure_ascii=False)
+            # Parsing runs inside the chain: a ValueError leaves the cache untouched and
+            # the next attempt asks the model again.
+            answer_dict = await llm.ainvoke(
+                chain,
+                {"article": article_text},
+                name="entity_extraction",
+                tokens=estimate_tokens(article_text),
+                cache=cache_spec("entity_extraction", EXTRACTION_PROMPT, model),
             )
-            message = HumanMessage(content=article_text)
-
-            # Create message and prompt chain
-            assistant_prompt = ChatPromptTemplate.from_messages([
-                ('system', SYSTEM_PROMPT),
-                message
-            ])
-
-            # Invoke the model
-            assistant_chain = assistant_prompt | model
-            raw_response = assistant_chain.invoke({})
-
-            # Extract hypothesis and validate
-            answer = extract_text_inside_tags(raw_response.content, "answer")
-            if not answer or len(answer.strip()) == 0:
+            if answer_dict is None:
                 return {}
-
-            try:
-                answer_dict = json.loads(answer)
-            except json.JSONDecodeError as je:
-                raise ValueError(f"Failed to parse JSON from answer: {je}")
-
-            else:
-                result_state = {
-                    "entities_news": answer_dict,
-                }
-
-                return result_state
+            return {"entities_news": answer_dict}
 
         except ValueError as e:
             print(f"Attempt {attempt}/{MAX_ATTEMPTS} in parsed_struct_text failed: {e}")
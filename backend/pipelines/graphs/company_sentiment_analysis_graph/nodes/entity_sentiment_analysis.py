@@ -1,3 +1,5 @@
+import asyncio
+
 from transformers import pipeline
 from backend.pipelines.graphs.company_sentiment_analysis_graph.state import OverallState, SubState
 
@@ -8,13 +10,13 @@ sentiment_model = pipeline(
 
 MAX_ATTEMPTS = 3
 
-def entity_sentiment_analysis(state: SubState) -> OverallState:
+async def entity_sentiment_analysis(state: SubState) -> OverallState:
     for attempt in range(1, MAX_ATTEMPTS + 1):
         try:
             article_text = state["text"]
 
-            # Run sentiment analysis
-            raw_response = sentiment_model(article_text)[0]
+            # Run sentiment analysis (CPU-bound, keep it off the event loop)
+            raw_response = (await asyncio.to_thread(sentiment_model, article_text))[0]
 
             result_state = {
                 "entities_sentiment": [{
@@ -9,6 +9,8 @@ from langgraph.graph import add_messages
 class InputState(TypedDict):
     unstructured_article: str
     insert_article_id: int
+    # Prefilled by the single-pass analysis; entity extraction is skipped when present.
+    entities_news: list
 
 
 class OverallState(TypedDict):
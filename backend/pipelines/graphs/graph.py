@@ -6,10 +6,10 @@ from backend.pipelines.graphs.web_scrapper_graph.graph import graph as scrapper_
 from backend.pipelines.graphs.web_scrapper_graph.state import InitState, OverallState, OutputState
 from backend.pipelines.graphs.ingest_graph.state import GraphState
 from backend.pipelines.graphs.send_unstructured_articles import send_unstructured_articles
+from backend.services.vector_index import vector_index
 
 import json
 
-from backend.pipelines.graphs.web_scrapper_graph.nodes.hardcoded_website import get_posts_hardcoded
 from backend.pipelines.graphs.web_scrapper_graph.nodes.send_articles import send_article
 import asyncio
 
@@ -19,7 +19,7 @@ builder = StateGraph(OverallState,
                      output=OutputState
                      )
 
-def end_of_graph(state: OutputState):
+async def end_of_graph(state: OutputState):
     return state
 
 builder.add_node("Scrap Posts", scrapper_graph)
@@ -35,6 +35,8 @@ builder.add_edge("End of graph", END)
 graph = builder.compile()
 
 async def run():
+    # The app starts this in before_serving; run standalone, start it here.
+    vector_index.kick_warm()
     print(await graph.ainvoke({"link": "https://finance.yahoo.com/news/"}))
 
 if __name__ == "__main__":
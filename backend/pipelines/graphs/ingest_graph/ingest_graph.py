@@ -3,7 +3,7 @@ from typing import TypedDict, Dict, Any, List, Tuple
 
 from langgraph.graph import StateGraph, START, END
 from sqlalchemy import select, bindparam, cast
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import undefer
 from backend.pipelines.graphs.ingest_graph.state import GraphState
 
 from backend.pipelines.graphs.web_scrapper_graph import graph as initial_graph
@@ -11,11 +11,33 @@ from backend.pipelines.graphs.web_scrapper_graph.state import InitState, Overall
 from backend.pipelines.graphs.ingest_graph.nodes.normalize_article import normalize_article
 from backend.repositories.articles import insert_article
 from backend.repositories.analysis import insert_analysis_packet
-from backend.pipelines.graphs.ingest_graph.nodes.news_analysis import analyze_news
+from backend.pipelines.graphs.ingest_graph.nodes.story_cluster import (
+    attach_pending,
+    node_cluster,
+    route_after_cluster,
+)
+from backend.pipelines.graphs.ingest_graph.nodes.news_analysis import (
+    ANALYSIS_MODE,
+    SINGLE_PASS,
+    analyze_news,
+    analyze_news_light,
+    analyze_news_single_pass,
+)
+from backend.pipelines.graphs.ingest_graph.nodes.impact_gate import (
+    FULL,
+    LIGHT,
+    STORE_ONLY,
+    impact_gate,
+    route_after_gate,
+)
 from backend.services.rag import get_style_guide, get_brand_snippets
-from backend.services.verify_output import verify_packet
-from backend.services.embeddings import embed_text
-from backend.db.session import SessionLocal
+from backend.services.verify_output import pre_verify, verify_packet
+from backend.services.embeddings import aembed_text
+from backend.services.title_dedup import title_index
+from backend.services.url_index import url_index
+from backend.services.vector_index import vector_index, VECTOR_INDEX_DAYS
+from backend.utils.helpers import utcnow
+from datetime import timedelta
 from backend.db.session import AsyncSessionLocal
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -25,6 +47,8 @@ from backend.pipelines.graphs.company_sentiment_analysis_graph.graph import grap
 
 
 # --- Nodes ---
+# The graph forks after insert, so nodes return only the keys they set: two
+# branches writing the same key in one step would be rejected by LangGraph.
 
 
 ALLOWED_KEYS = {
@@ -33,40 +57,91 @@ ALLOWED_KEYS = {
     "bullets", "actions", "risks", "citations", "important", "markets"
 }
 
+SEEN_STATUSES = {"inserted", "duplicate", "exists", "semantic-duplicate"}
+
+
 async def node_insert(state: GraphState) -> GraphState:
     status, ref_url, metric, article_id = await insert_article(state["article_row"])
-    state["insert_status"] = status
+    # Stored or known to duplicate a stored article: no need to crawl it again.
+    # Anything else (a failed insert) stays eligible for the next scrape.
+    if status in SEEN_STATUSES:
+        url_index.add(state["article_row"]["url"])
+    update = {"insert_status": status}
+    if status == "inserted":
+        # Only a stored copy may suppress other sources' listings of the same story.
+        title_index.add(state["article_row"]["url"], state["article_row"].get("title") or "")
+        # Summed over the run's articles in the parent graph; the scheduler adapts on it.
+        update["inserted_urls"] = [state["article_row"]["url"]]
     if ref_url:
-        state["insert_ref_url"] = ref_url
+        update["insert_ref_url"] = ref_url
     if metric is not None:
-        state["insert_metric"] = metric
+        update["insert_metric"] = metric
     if article_id is not None:
-        state["insert_article_id"] = article_id
+        update["insert_article_id"] = article_id
+
+    return update
 
-    return state
 
+def _sentiment_now(state: GraphState) -> bool:
+    # Company sentiment needs only the article text and its id, not the analysis packet.
+    return state.get("insert_status") == "inserted" and state.get("insert_article_id") is not None
 
-def route_after_insert(state: GraphState) -> str:
+
+def _primary_url(state: GraphState) -> str:
+    # A refreshed story is analysed under the article it was first stored as.
+    cluster = state.get("cluster")
+    return cluster["ref_url"] if cluster else state["article_row"]["url"]
+
+
+def route_after_insert(state: GraphState) -> List[str]:
     # If near-duplicate by SimHash, skip analysis
     if (state.get("insert_status") == "duplicate") or (state.get("insert_status") == "exists"):
-        return "skip"
-    # For new insert or semantic-duplicate, we still analyze (useful to refresh packet)
-    return "analyze"
+        return [END]
+    # Semantic duplicates join the existing story; it is re-analysed only if the copy adds something.
+    if state.get("insert_status") == "semantic-duplicate":
+        return ["cluster"]
+    routes = ["fetch_related"]
+    # In single-pass mode sentiment waits for the entity contexts the analysis returns.
+    if ANALYSIS_MODE != SINGLE_PASS and _sentiment_now(state):
+        routes.append("sentiment_analysis")
+    return routes
 
 
 async def node_fetch_related(state: GraphState) -> GraphState:
+    cluster = state.get("cluster")
+    if not cluster:
+        return {"related_articles": await _related_to(state["article_row"]["url"])}
+    # Refresh: the new copy leads the related list so the analysis sees what it adds.
+    copy_row = state["article_row"]
+    copy = {k: copy_row.get(k) for k in ("url", "title", "summary", "published_at", "source_domain")}
+    related = [r for r in await _related_to(cluster["ref_url"]) if r["url"] != copy["url"]]
+    return {"related_articles": [copy] + related[:4]}
+
+
+def route_after_fetch_related(state: GraphState) -> str:
+    # A refreshed story was gated when it was first analysed.
+    return "analyze" if state.get("cluster") else "impact_gate"
+
+
+async def _related_to(url: str) -> List[Dict[str, Any]]:
+    # Hot path: the article was just added to the in-memory index by insert_article.
+    emb = vector_index.vector(url) if vector_index.ready else None
+    if emb is not None:
+        return vector_index.topk(emb, 5, exclude_url=url)
+
     async with AsyncSessionLocal() as session:
         result = await session.execute(
-            select(Article).where(Article.url == state["article_row"]["url"])
+            select(Article)
+            .options(undefer(Article.content_emb))
+            .where(Article.url == url)
         )
         primary = result.scalars().first()
         if not primary:
-            state["related_articles"] = []
-            return state
+            return []
 
-        emb = primary.content_emb or embed_text(
-            f"{primary.title or ''}\n\n{primary.summary or ''}"
-        )
+        emb = primary.content_emb
+        if emb is None:
+            emb = await aembed_text(f"{primary.title or ''}\n\n{primary.summary or ''}")
         # emb_str = "[" + ",".join(f"{x:.6f}" for x in emb) + "]"
         dist = Article.content_emb.op("<=>")(cast(bindparam("emb"), Vector1536()))
         result = await session.execute(
@@ -76,9 +151,12 @@ async def node_fetch_related(state: GraphState) -> GraphState:
                 Article.summary,
                 Article.published_at,
                 Article.source_domain,
-                Article.content_emb,
             )
-            .where(Article.url != primary.url, Article.content_emb.isnot(None))
+            .where(
+                Article.url != primary.url,
+                Article.content_emb.isnot(None),
+                Article.fetched_at >= utcnow() - timedelta(days=VECTOR_INDEX_DAYS),
+            )
             .order_by(dist)
             .limit(5),
             {"emb": emb},
@@ -93,62 +171,116 @@ async def node_fetch_related(state: GraphState) -> GraphState:
                     "summary": r[2],
                     "published_at": r[3],
                     "source_domain": r[4],
-                    "content_emb": r[5],
                 }
             )
-        state["related_articles"] = related
-        return state
+        return related
+
+
+async def _load_primary(session: AsyncSession, url: str) -> Dict[str, Any]:
+    # Build primary dict from DB row for consistency
+    stmt = select(Article).where(Article.url == url)
+    result = await session.execute(stmt)
+    pr = result.scalar_one_or_none()
+    return {
+        "url": pr.url,
+        "title": pr.title,
+        "summary": pr.summary,
+        "published_at": pr.published_at,
+        "source_domain": pr.source_domain,
+    }
 
 
 async def node_analyze(state: GraphState) -> GraphState:
     async with AsyncSessionLocal() as session:
         # Style and brand snippets (RAG)
         style = get_style_guide()
-        qtext = f"{state['article_row'].get('title', '')} {state['article_row'].get('summary', '')}"
-        rag = await get_brand_snippets(session, qtext, k=3)
-
-        # Build primary dict from DB row for consistency
-        stmt = select(Article).where(Article.url == state["article_row"]["url"])
-        result = await session.execute(stmt)
-        pr = result.scalar_one_or_none()
-        primary = {
-            "url": pr.url,
-            "title": pr.title,
-            "summary": pr.summary,
-            "published_at": pr.published_at,
-            "source_domain": pr.source_domain,
-        }
-
-        analysis_obj = analyze_news(
-            primary, state.get("related_articles", []), style, rag
-        )
-        state["analysis"] = analysis_obj.model_dump()
-        return state
+        # normalize_article already embedded "{title}\n\n{summary}"; reuse it rather than embed again.
+        row = state["article_row"]
+        qtext = f"{row.get('title') or ''}\n\n{row.get('summary') or ''}"
+        rag = await get_brand_snippets(session, qtext, k=3, emb=row.get("content_emb"))
+        primary = await _load_primary(session, _primary_url(state))
+
+        related = state.get("related_articles", [])
+        pre_score = state.get("gate", {}).get("score")
+        if ANALYSIS_MODE == SINGLE_PASS:
+            # Market contexts come back with the analysis; the sentiment graph skips its extraction call.
+            analysis_obj, entities = await analyze_news_single_pass(
+                primary, related, style, rag, pre_score=pre_score
+            )
+            return {"analysis": analysis_obj.model_dump(), "entities_news": entities}
+        analysis_obj = await analyze_news(primary, related, style, rag, pre_score=pre_score)
+        return {"analysis": analysis_obj.model_dump()}
+
+
+async def node_analyze_light(state: GraphState) -> GraphState:
+    # Gated to the single-call analysis: no brand RAG lookup, no separate writer pass.
+    async with AsyncSessionLocal() as session:
+        primary = await _load_primary(session, _primary_url(state))
+
+    analysis_obj = await analyze_news_light(primary, state.get("related_articles", []), get_style_guide())
+    return {"analysis": analysis_obj.model_dump()}
 
 
 async def node_verify_and_persist(state: GraphState) -> GraphState:
     # Build sources text for verification
     parts = []
-    parts.append(
-        f"{state['article_row'].get('title', '')} :: {state['article_row'].get('summary', '')}"
-    )
+    cluster = state.get("cluster")
+    primary = cluster["ref_row"] if cluster else state["article_row"]
+    parts.append(f"{primary.get('title', '')} :: {primary.get('summary', '')}")
     for r in state.get("related_articles", []):
         parts.append(f"{r.get('title', '')} :: {r.get('summary', '')}")
     sources_text = "\n\n".join(parts)
 
-    ver = verify_packet(sources_text, state["analysis"])
-    state["verified"] = ver.ok
-    state["verification_issues"] = ver.issues
+    if state.get("gate", {}).get("decision") == LIGHT:
+        # Low pre-score packets get the local check only; unmatched claims are recorded
+        # as issues instead of paying for the LLM checker.
+        unmatched = pre_verify(sources_text, state["analysis"])
+        update = {"verified": not unmatched, "verification_issues": unmatched}
+    else:
+        ver = await verify_packet(sources_text, state["analysis"])
+        update = {"verified": ver.ok, "verification_issues": ver.issues}
 
     # Persist packet
     async with AsyncSessionLocal() as session:
+        # On refresh the upsert merges these with the copies already attached to the story.
         cluster_urls = [x["url"] for x in state.get("related_articles", [])]
         await insert_analysis_packet(
-            session, state["article_row"]["url"], state["analysis"], cluster_urls
+            session, _primary_url(state), state["analysis"], cluster_urls, refresh=bool(cluster)
         )
+        # Copies that arrived while this story was being analysed.
+        await attach_pending(session, _primary_url(state))
         await session.commit()
 
-    return state
+    return update
+
+
+async def node_sentiment(state: GraphState) -> GraphState:
+    # Runs beside the analysis branch; it writes its own table and nothing back to this state.
+    inputs = {
+        "unstructured_article": state["unstructured_article"],
+        "insert_article_id": state["insert_article_id"],
+    }
+    if "entities_news" in state:
+        inputs["entities_news"] = state["entities_news"]
+    await company_sentiment_analysis_graph.ainvoke(inputs)
+    return {}
+
+
+GATE_ROUTES = {FULL: "analyze", LIGHT: "analyze_light", STORE_ONLY: END}
+
+
+def route_after_impact_gate(state: GraphState) -> List[str]:
+    route = GATE_ROUTES[route_after_gate(state)]
+    if ANALYSIS_MODE == SINGLE_PASS and route != "analyze" and _sentiment_now(state):
+        # No single-pass contexts on this path; the sentiment graph extracts its own.
+        return [r for r in (route, "sentiment_analysis") if r != END]
+    return [route]
+
+
+def route_after_analyze(state: GraphState) -> List[str]:
+    if ANALYSIS_MODE == SINGLE_PASS and _sentiment_now(state):
+        return ["verify_and_persist", "sentiment_analysis"]
+    return ["verify_and_persist"]
 
 
 # --- Build graph ---
@@ -156,19 +288,35 @@ graph_builder = StateGraph(GraphState)
 
 graph_builder.add_node("normalize_article", normalize_article)
 graph_builder.add_node("insert", node_insert)
+graph_builder.add_node("cluster", node_cluster)
 graph_builder.add_node("fetch_related", node_fetch_related)
+graph_builder.add_node("impact_gate", impact_gate)
 graph_builder.add_node("analyze", node_analyze)
+graph_builder.add_node("analyze_light", node_analyze_light)
 graph_builder.add_node("verify_and_persist", node_verify_and_persist)
-graph_builder.add_node("sentiment_analysis", company_sentiment_analysis_graph)
+graph_builder.add_node("sentiment_analysis", node_sentiment)
 
 graph_builder.add_edge(START, "normalize_article")
 graph_builder.add_edge("normalize_article", "insert")
+# After insert the analysis branch (fetch_related -> ... -> verify_and_persist) and
+# sentiment_analysis run side by side; the run ends once both branches reach END.
+graph_builder.add_conditional_edges(
+    "insert", route_after_insert, ["fetch_related", "sentiment_analysis", "cluster", END]
+)
+graph_builder.add_conditional_edges(
+    "cluster", route_after_cluster, {"attached": END, "refresh": "fetch_related"}
+)
+graph_builder.add_conditional_edges(
+    "fetch_related", route_after_fetch_related, ["impact_gate", "analyze"]
+)
+graph_builder.add_conditional_edges(
+    "impact_gate", route_after_impact_gate, ["analyze", "analyze_light", "sentiment_analysis", END]
+)
 graph_builder.add_conditional_edges(
-    "insert", route_after_insert, {"skip": END, "analyze": "fetch_related"}
+    "analyze", route_after_analyze, ["verify_and_persist", "sentiment_analysis"]
 )
-graph_builder.add_edge("fetch_related", "analyze")
-graph_builder.add_edge("analyze", "verify_and_persist")
-graph_builder.add_edge("verify_and_persist", "sentiment_analysis")
+graph_builder.add_edge("analyze_light", "verify_and_persist")
+graph_builder.add_edge("verify_and_persist", END)
 graph_builder.add_edge("sentiment_analysis", END)
 
 graph = graph_builder.compile()
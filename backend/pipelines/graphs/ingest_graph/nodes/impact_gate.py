@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List
+
+from backend.pipelines.graphs.ingest_graph.nodes.news_analysis import (
+    ExtractedFacts,
+    deterministic_score,
+)
+from backend.pipelines.graphs.ingest_graph.state import GraphState
+
+# Pre-scores (0-100) at or above these get the full 3-call analysis / the single-call one.
+IMPACT_GATE_FULL = float(os.getenv("IMPACT_GATE_FULL", "45"))
+IMPACT_GATE_LIGHT = float(os.getenv("IMPACT_GATE_LIGHT", "20"))
+IMPACT_GATE_ENABLED = os.getenv("IMPACT_GATE_ENABLED", "1") == "1"
+
+FULL = "full"
+LIGHT = "light"
+STORE_ONLY = "store_only"
+
+SOURCE_WEIGHTS = {
+    "reuters.com": 1.0,
+    "ft.com": 1.0,
+    "bloomberg.com": 1.0,
+    "wsj.com": 0.95,
+    "cnbc.com": 0.85,
+    "finance.yahoo.com": 0.7,
+}
+DEFAULT_SOURCE_WEIGHT = 0.6
+
+EVENT_KEYWORDS = {
+    "EARNINGS": r"earnings|quarterly (?:profit|results|revenue)|eps|beats? estimates|misses? estimates",
+    "GUIDANCE": r"guidance|outlook|forecasts? (?:cut|raise)|raises? forecast|cuts? forecast",
+    "RATING_CHANGE": r"upgrade|downgrade|price target|rating",
+    "CEO_EXIT": r"\bceo\b.*(?:resign|step|exit|depart|oust)|(?:resign|steps down)",
+    "M&A": r"acqui|merger|takeover|buyout|to buy\b|deal to purchase|stake in",
+    "MACRO_POLICY": r"\bfed\b|federal reserve|\becb\b|\bsnb\b|\bboj\b|rate (?:cut|hike)|inflation|cpi|payrolls|gdp|central bank",
+    "REGULATORY": r"regulator|\bsec\b|antitrust|approval|ban\b|probe|fine[sd]?\b",
+    "GEOPOLITICAL": r"sanction|tariff|war\b|missile|election|ceasefire|invasion|trade talks",
+    "SUPPLY_CHAIN": r"shortage|supply chain|shipping|output cut|production halt",
+    "LEGAL": r"lawsuit|court|sued|settlement|verdict",
+    "PRODUCT": r"launch|unveil|new model|product",
+    "MARKET_MOVE": r"stocks? (?:fall|rise|slump|rally|surge|tumble)|sell-?off|record high|yields? (?:jump|fall)",
+}
+MARKET_KEYWORDS = {
+    "usa_equities": r"s&p 500|nasdaq|dow jones|wall street|u\.s\. stocks",
+    "eu_equities": r"stoxx|\bdax\b|ftse|\bcac\b|european shares|european stocks",
+    "japan_equities": r"nikkei|topix|japanese stocks",
+    "emerging_markets": r"emerging markets?|china|india|brazil|mexico|indonesia",
+    "fx_usd": r"dollar|\bfed\b|federal reserve",
+    "fx_eur": r"\beuro\b|\becb\b",
+    "fx_chf": r"swiss franc|\bfranc\b|\bsnb\b",
+    "fx_jpy": r"\byen\b|\bboj\b|bank of japan",
+    "gold": r"\bgold\b|bullion",
+    "global_gov_bonds": r"treasur|bund|gilt|sovereign debt|bond yields?",
+    "global_corp_bonds": r"credit spread|corporate bond|high-yield|junk bond",
+}
+# Headlines of this kind rarely move anything we track.
+LOW_VALUE_TITLE = re.compile(
+    r"(best .* to buy|how to |what to know|podcast|video:|watch:|quiz|horoscope|"
+    r"mortgage rates today|personal finance|\bopinion\b|review:|deals? of the day|"
+    r"top \d+ |\d+ stocks? to)",
+    re.IGNORECASE,
+)
+_NUMERIC = re.compile(r"\d+(?:\.\d+)?\s?(?:%|percent|bn|billion|mn|million|bps|basis points)|\$\s?\d")
+_TICKER = re.compile(r"\((?:[A-Z]+:)?([A-Z]{1,5}(?:\.[A-Z])?)\)|\$([A-Z]{1,5})\b")
+
+_EVENT_RE = {k: re.compile(v, re.IGNORECASE) for k, v in EVENT_KEYWORDS.items()}
+_MARKET_RE = {k: re.compile(v, re.IGNORECASE) for k, v in MARKET_KEYWORDS.items()}
+
+stats = {FULL: 0, LIGHT: 0, STORE_ONLY: 0}
+
+
+def _recency_hours(published_at: Any) -> Any:
+    if isinstance(published_at, datetime):
+        dt = published_at if published_at.tzinfo else published_at.replace(tzinfo=timezone.utc)
+    elif isinstance(published_at, date):
+        dt = datetime(published_at.year, published_at.month, published_at.day, tzinfo=timezone.utc)
+    else:
+        return None
+    return max(0.0, (datetime.now(timezone.utc) - dt).total_seconds() / 3600.0)
+
+
+def guess_facts(title: str, summary: str) -> ExtractedFacts:
+    """Keyword stand-in for the _extract LLM call, enough for deterministic_score."""
+    text = f"{title}\n{summary}"
+    event_type = next((k for k, rx in _EVENT_RE.items() if rx.search(title)), None)
+    event_type = event_type or next((k for k, rx in _EVENT_RE.items() if rx.search(summary)), "OTHER")
+    tickers = sorted({a or b for a, b in _TICKER.findall(text)})
+    numerics = {f"n{i}": m for i, m in enumerate(_NUMERIC.findall(text)[:5])}
+    markets = [k for k, rx in _MARKET_RE.items() if rx.search(text)]
+    return ExtractedFacts(event_type=event_type, tickers=tickers, numerics=numerics, markets=markets)
+
+
+def gate_score(row: Dict[str, Any], related: List[Dict[str, Any]]) -> Dict[str, Any]:
+    title, summary = row.get("title") or "", row.get("summary") or ""
+    facts = guess_facts(title, summary)
+    meta = {"recency_hours": _recency_hours(row.get("published_at"))}
+    score = 100 * deterministic_score(meta, facts)
+
+    source_weight = SOURCE_WEIGHTS.get(row.get("source_domain") or "", DEFAULT_SOURCE_WEIGHT)
+    score *= source_weight
+    # Portfolio markets are what the feed is about; other outlets covering it says it matters.
+    score += 5 * min(len(facts.markets), 3)
+    score += 3 * min(len(related), 3)
+    low_value = bool(LOW_VALUE_TITLE.search(title))
+    if low_value:
+        score *= 0.5
+
+    return {
+        "score": round(min(score, 100.0), 1),
+        "event_type": facts.event_type,
+        "markets": facts.markets,
+        "tickers": facts.tickers,
+        "source_weight": source_weight,
+        "low_value_title": low_value,
+    }
+
+
+async def impact_gate(state: GraphState) -> GraphState:
+    signals = gate_score(state["article_row"], state.get("related_articles", []))
+    if not IMPACT_GATE_ENABLED or signals["score"] >= IMPACT_GATE_FULL:
+        decision = FULL
+    elif signals["score"] >= IMPACT_GATE_LIGHT:
+        decision = LIGHT
+    else:
+        decision = STORE_ONLY
+    stats[decision] += 1
+    if decision != FULL:
+        print(f"impact_gate: {decision} (pre-score {signals['score']}) for {state['article_row']['url']}")
+    return {"gate": {"decision": decision, **signals}}
+
+
+def route_after_gate(state: GraphState) -> str:
+    return state["gate"]["decision"]
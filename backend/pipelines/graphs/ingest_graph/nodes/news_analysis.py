@@ -1,12 +1,13 @@
 # services/news_analysis.py
 from __future__ import annotations
-from typing import List, Optional, Dict, Any
+import os
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timezone
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 
 from backend.services.event_taxonomy import EVENT_TYPES
+from backend.services.llm_cascade import LLM_ESCALATE_IMPACT, ModelCascade
 
 PORTFOLIO_MARKETS = {
     "fx_usd": "FX USD",
@@ -23,6 +24,11 @@ PORTFOLIO_MARKETS = {
 }
 MARKET_KEYS = list(PORTFOLIO_MARKETS.keys())
 
+# "chain": extract -> score -> write (3 calls) plus entity extraction in the sentiment graph.
+# "single_pass": one call returning the analysis and the per-market entity contexts.
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "chain")
+SINGLE_PASS = "single_pass"
+
 
 # ---------- Models ----------
 class ExtractedFacts(BaseModel):
@@ -54,6 +60,29 @@ class Importance(BaseModel):
     importance: bool
 
 
+class LightAnalysis(BaseModel):
+    extracted: ExtractedFacts
+    impact: ImpactSignals
+    executive_summary: str
+    bullets: List[str]
+    risks: List[str] = []
+
+
+class MarketContext(BaseModel):
+    entity: str = Field(..., description="One of " + ", ".join(MARKET_KEYS))
+    context: str
+
+
+class SinglePassAnalysis(BaseModel):
+    extracted: ExtractedFacts
+    impact: ImpactSignals
+    executive_summary: str
+    bullets: List[str]
+    actions: List[str] = []
+    risks: List[str] = []
+    market_contexts: List[MarketContext] = []
+
+
 class NewsAnalysis(BaseModel):
     extracted: ExtractedFacts
     impact: ImpactSignals
@@ -61,12 +90,6 @@ class NewsAnalysis(BaseModel):
     packet: AnalystPacket
 
 
-# ---------- LLMs ----------
-# Adjusted temperature for each task: low for extraction, higher for analysis/writing.
-_extractor = ChatOpenAI(model="gpt-4o", temperature=0.1)
-_scorer = ChatOpenAI(model="gpt-4o", temperature=0.4)
-_writer = ChatOpenAI(model="gpt-4o", temperature=0.5)
-
 # ---------- Prompts ----------
 extract_prompt = ChatPromptTemplate.from_messages(
     [
@@ -135,7 +158,7 @@ write_prompt = ChatPromptTemplate.from_messages(
             """
 You are a senior analyst at a top-tier investment firm, writing a brief for the morning meeting. Your tone should be objective, concise, and forward-looking, avoiding hype or speculation.
 
-Reference the provided style guide and any RAG snippets for tone. Your task is to synthesize the extracted facts and impact scores into a polished, analyst-ready brief.
+Reference the provided style guide and any RAG snippets for tone. Your task is to synthesize the extracted facts and impact assessment into a polished, analyst-ready brief.
 
 Return ONLY a single JSON object with the specified keys.
 
@@ -171,46 +194,145 @@ Source Citations:
 )
 
 
+light_prompt = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """
+You are a financial news analyst doing a quick triage pass. In ONE response, extract the facts, score the impact and write a short brief.
+
+Return ONLY a single JSON object with keys: extracted, impact, executive_summary, bullets, risks.
+- **extracted**: event_type (one of: {event_types}), tickers, companies, sectors, geos, numerics (snake_case label -> number), markets (KEYS from: {market_keys}; [] if none). Do not invent data.
+- **impact**: impact_score (0-100, 0-20 noise, 21-40 minor, 41-60 moderate, 61-80 high, 81-100 critical), confidence (0-1), novelty (0-1), rationale (1-2 sentences).
+- **executive_summary**: 1-2 sentences, max 250 characters, most important fact first.
+- **bullets**: 2-3 short factual sentences.
+- **risks**: 0-2 key uncertainties.
+
+Style guide:
+{style_guide}
+
+METADATA:
+{meta}
+
+ARTICLES:
+{articles_block}
+""".strip(),
+        )
+    ]
+)
+
+single_pass_prompt = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """
+You are a senior analyst at a top-tier investment firm. In ONE response, extract the market-relevant facts from the articles, assess their impact for a Chief Investment Officer, write a brief for the morning meeting and describe how each affected portfolio market is involved.
+
+Return ONLY a single JSON object with keys: extracted, impact, executive_summary, bullets, actions, risks, market_contexts.
+
+**extracted**:
+- **event_type**: one of: {event_types}.
+- **tickers**, **companies**, **sectors**, **geos**: as named or clearly implied by the text; [] if none.
+- **numerics**: key financial figures keyed by a descriptive snake_case label (e.g. {{"revenue_growth_yoy": 0.12}}).
+- **markets**: directly affected portfolio markets, chosen conservatively from these KEYS: {market_keys}; [] if none.
+- Do not invent data. Only extract values supported by the text.
+
+**impact**:
+- **impact_score (0-100)**: 0-20 noise, 21-40 minor (single stock), 41-60 moderate (sector or well-known company), 61-80 high (market-wide or large-cap), 81-100 critical (Fed pivot, major M&A).
+- **confidence (0-1)**: certainty in the extracted facts given the sources.
+- **novelty (0-1)**: 1.0 if first report of this event, 0.0 if a rehash.
+- **rationale**: 2-3 sentences on the "so what" for investors, considering source credibility, magnitude, breadth and recency.
+
+**Brief** (objective, concise, no hype; at most 900 characters in total):
+- **executive_summary**: 2-3 sentences, most important fact first, max 350 characters.
+- **bullets**: 3-5 complete, quantitative sentences.
+- **actions**: 0-3 considerations for a portfolio manager (e.g. "Consider reviewing exposure to X"), never direct advice.
+- **risks**: 1-3 key uncertainties.
+- Do not use numbers or tickers absent from the extracted facts.
+
+**market_contexts**: one item per key in extracted.markets:
+- **entity**: the market KEY.
+- **context**: 1-2 sentences on how this article affects that market, naming the companies, indices or assets involved.
+
+Style guide:
+{style_guide}
+
+Reference snippets:
+{rag_snippets}
+
+METADATA:
+{meta}
+
+ARTICLES:
+{articles_block}
+""".strip(),
+        )
+    ]
+)
+
+# ---------- LLMs ----------
+# Adjusted temperature for each task: low for extraction, higher for analysis/writing.
+# Each stage tries the cheap model first; see services/llm_cascade.py.
+_extractor = ModelCascade("extract", extract_prompt, ExtractedFacts, temperature=0.1)
+_scorer = ModelCascade("score", score_prompt, ImpactSignals, temperature=0.4)
+_writer = ModelCascade("write", write_prompt, AnalystPacket, temperature=0.5)
+_light = ModelCascade("analyze_light", light_prompt, LightAnalysis, temperature=0.2)
+_single = ModelCascade("single_pass", single_pass_prompt, SinglePassAnalysis, temperature=0.3)
+
+
+def _check_extracted(out: ExtractedFacts) -> Optional[str]:
+    if out.event_type not in EVENT_TYPES:
+        return f"invalid event_type {out.event_type!r}"
+    return None
+
+
 # ---------- Chains ----------
-def _extract(articles_block: str) -> ExtractedFacts:
-    chain = extract_prompt | _extractor.with_structured_output(
-        ExtractedFacts, method="function_calling"
-    )
-    return chain.invoke(
+def _cache_input(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    # recency_hours changes every second; keyed on it, replays would never hit the response cache.
+    meta = {k: v for k, v in inputs["meta"].items() if k != "recency_hours"}
+    return {**inputs, "meta": meta}
+
+
+async def _extract(articles_block: str, start_large: bool = False) -> ExtractedFacts:
+    return await _extractor.ainvoke(
         {
             "articles_block": articles_block,
             "event_types": ", ".join(EVENT_TYPES),
             "market_keys": ", ".join(MARKET_KEYS),
-        }
+        },
+        check=_check_extracted,
+        start_large=start_large,
     )
 
 
-def _score(meta: Dict[str, Any], extracted: ExtractedFacts) -> ImpactSignals:
-    chain = score_prompt | _scorer.with_structured_output(
-        ImpactSignals, method="function_calling"
+async def _score(meta: Dict[str, Any], extracted: ExtractedFacts, start_large: bool = False) -> ImpactSignals:
+    inputs = {"meta": meta, "extracted": extracted.model_dump()}
+    return await _scorer.ainvoke(
+        inputs,
+        cache_input=_cache_input(inputs),
+        check=lambda out: _scorer.low_confidence(out.confidence),
+        start_large=start_large,
     )
-    return chain.invoke({"meta": meta, "extracted": extracted.model_dump()})
 
 
-def _write(
+async def _write(
     style_guide: str,
     rag_snippets: str,
     extracted: ExtractedFacts,
     impact: ImpactSignals,
     citations: List[Dict[str, Any]],
 ) -> AnalystPacket:
-    chain = write_prompt | _writer.with_structured_output(
-        AnalystPacket, method="function_calling"
-    )
-    return chain.invoke(
-        {
-            "style_guide": style_guide,
-            "rag_snippets": rag_snippets,
-            "extracted": extracted.model_dump(),
-            "impact": impact.model_dump(),
-            "citations": citations,
-        }
-    )
+    inputs = {
+        "style_guide": style_guide,
+        "rag_snippets": rag_snippets,
+        "extracted": extracted.model_dump(),
+        # The blended score drifts with recency: in the prompt it would both miss the
+        # cache and leave replayed briefs quoting a number that no longer matches.
+        "impact": impact.model_dump(exclude={"impact_score"}),
+        "citations": citations,
+    }
+    # The brief for a high-impact story is what readers see first; write it with the large model.
+    return await _writer.ainvoke(inputs, start_large=impact.impact_score >= LLM_ESCALATE_IMPACT)
 
 
 # ---------- Deterministic blend ----------
@@ -249,22 +371,15 @@ def blend_scores(llm_score: int, det_score: float) -> int:
 
 
 # ---------- Orchestrator ----------
-def analyze_news(
-    primary_article: Dict[str, Any],
-    related_articles: List[Dict[str, Any]],
-    style_guide: str,
-    rag_snippets: str,
-) -> NewsAnalysis:
+def _articles_block(primary_article: Dict[str, Any], related_articles: List[Dict[str, Any]]) -> str:
     def pack(a):
         ts = a.get("published_at")
         return f"- {a.get('title','').strip()} [{a.get('source_domain','')} ; {ts}]\n  {a.get('summary','').strip()}"
 
-    articles_block = "\n".join(
-        [pack(primary_article)] + [pack(x) for x in related_articles]
-    )
+    return "\n".join([pack(primary_article)] + [pack(x) for x in related_articles])
 
-    extracted = _extract(articles_block)
 
+def _meta(primary_article: Dict[str, Any], related_articles: List[Dict[str, Any]]) -> Dict[str, Any]:
     now = datetime.now(timezone.utc)
     recency_hours = None
     if primary_article.get("published_at"):
@@ -274,38 +389,135 @@ def analyze_news(
         if dt:
             recency_hours = max(0.0, (now - dt).total_seconds() / 3600.0)
 
-    meta = {
+    return {
         "recency_hours": recency_hours,
         "source_domain": primary_article.get("source_domain"),
         "n_related": len(related_articles),
     }
-    impact_llm = _score(meta, extracted)
-    det = deterministic_score(meta, extracted)
-    impact_blended = ImpactSignals(
-        impact_score=blend_scores(impact_llm.impact_score, det),
-        confidence=impact_llm.confidence,
-        novelty=impact_llm.novelty,
-        rationale=impact_llm.rationale,
-    )
 
-    importance = Importance(importance=impact_blended.impact_score >= 60)
 
-    cites = [
-        {
-            "url": primary_article.get("url"),
-            "title": primary_article.get("title"),
-            "published_at": str(primary_article.get("published_at")),
-        }
-    ] + [
+def _citations(primary_article: Dict[str, Any], related_articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
         {
             "url": x.get("url"),
             "title": x.get("title"),
             "published_at": str(x.get("published_at")),
         }
-        for x in related_articles
+        for x in [primary_article] + list(related_articles)
     ]
 
-    packet = _write(style_guide, rag_snippets, extracted, impact_blended, cites)
+
+def _blend(impact_llm: ImpactSignals, meta: Dict[str, Any], extracted: ExtractedFacts) -> ImpactSignals:
+    det = deterministic_score(meta, extracted)
+    return ImpactSignals(
+        impact_score=blend_scores(impact_llm.impact_score, det),
+        confidence=impact_llm.confidence,
+        novelty=impact_llm.novelty,
+        rationale=impact_llm.rationale,
+    )
+
+
+async def analyze_news(
+    primary_article: Dict[str, Any],
+    related_articles: List[Dict[str, Any]],
+    style_guide: str,
+    rag_snippets: str,
+    pre_score: Optional[float] = None,
+) -> NewsAnalysis:
+    """`pre_score` is the impact gate's estimate; high values skip the cheap model."""
+    start_large = pre_score is not None and pre_score >= LLM_ESCALATE_IMPACT
+    articles_block = _articles_block(primary_article, related_articles)
+    extracted = await _extract(articles_block, start_large)
+
+    meta = _meta(primary_article, related_articles)
+    impact_llm = await _score(meta, extracted, start_large)
+    impact_blended = _blend(impact_llm, meta, extracted)
+
+    importance = Importance(importance=impact_blended.impact_score >= 60)
+
+    cites = _citations(primary_article, related_articles)
+    packet = await _write(style_guide, rag_snippets, extracted, impact_blended, cites)
     return NewsAnalysis(
         extracted=extracted, impact=impact_blended, packet=packet, importance=importance
     )
+
+
+async def analyze_news_light(
+    primary_article: Dict[str, Any],
+    related_articles: List[Dict[str, Any]],
+    style_guide: str,
+) -> NewsAnalysis:
+    """One structured call instead of extract/score/write, for articles the impact gate rates low."""
+    meta = _meta(primary_article, related_articles)
+    inputs = {
+        "articles_block": _articles_block(primary_article, related_articles),
+        "meta": meta,
+        "style_guide": style_guide,
+        "event_types": ", ".join(EVENT_TYPES),
+        "market_keys": ", ".join(MARKET_KEYS),
+    }
+    out = await _light.ainvoke(
+        inputs,
+        cache_input=_cache_input(inputs),
+        check=lambda out: _check_extracted(out.extracted) or _light.low_confidence(out.impact.confidence),
+    )
+    impact_blended = _blend(out.impact, meta, out.extracted)
+    packet = AnalystPacket(
+        executive_summary=out.executive_summary,
+        bullets=out.bullets,
+        risks=out.risks,
+        citations=_citations(primary_article, related_articles),
+    )
+    return NewsAnalysis(
+        extracted=out.extracted,
+        impact=impact_blended,
+        packet=packet,
+        importance=Importance(importance=impact_blended.impact_score >= 60),
+    )
+
+
+async def analyze_news_single_pass(
+    primary_article: Dict[str, Any],
+    related_articles: List[Dict[str, Any]],
+    style_guide: str,
+    rag_snippets: str,
+    pre_score: Optional[float] = None,
+) -> Tuple[NewsAnalysis, List[Dict[str, str]]]:
+    """
+    ANALYSIS_MODE=single_pass: extract, score, write and the sentiment graph's entity
+    extraction in one structured call. Returns the analysis and the `entities_news`
+    list ({entity, context} per affected market).
+    """
+    meta = _meta(primary_article, related_articles)
+    inputs = {
+        "articles_block": _articles_block(primary_article, related_articles),
+        "meta": meta,
+        "style_guide": style_guide,
+        "rag_snippets": rag_snippets,
+        "event_types": ", ".join(EVENT_TYPES),
+        "market_keys": ", ".join(MARKET_KEYS),
+    }
+    out = await _single.ainvoke(
+        inputs,
+        cache_input=_cache_input(inputs),
+        check=lambda out: _check_extracted(out.extracted) or _single.low_confidence(out.impact.confidence),
+        start_large=pre_score is not None and pre_score >= LLM_ESCALATE_IMPACT,
+    )
+    impact_blended = _blend(out.impact, meta, out.extracted)
+    packet = AnalystPacket(
+        executive_summary=out.executive_summary,
+        bullets=out.bullets,
+        actions=out.actions,
+        risks=out.risks,
+        citations=_citations(primary_article, related_articles),
+    )
+    analysis = NewsAnalysis(
+        extracted=out.extracted,
+        impact=impact_blended,
+        packet=packet,
+        importance=Importance(importance=impact_blended.impact_score >= 60),
+    )
+    entities = [
+        {"entity": c.entity, "context": c.context} for c in out.market_contexts if c.entity in PORTFOLIO_MARKETS
+    ]
+    return analysis, entities
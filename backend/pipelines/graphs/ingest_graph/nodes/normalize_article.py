@@ -6,13 +6,13 @@ from typing import Optional, Any, Dict, List
 from urllib.parse import urlparse
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 
 from backend.services.dedup import simhash64, to_signed_64
 from backend.pipelines.graphs.ingest_graph.state import GraphState
-from backend.services.embeddings import embed_text
+from backend.services.embeddings import aembed_text
+from backend.services.llm_cascade import ModelCascade
 
 load_dotenv()
 
@@ -38,9 +38,6 @@ class ArticleEntry(ArticleNormalizationEntry):
     provider: str
 
 
-# Use a low temperature for deterministic, factual extraction.
-_model = ChatOpenAI(model="gpt-4o", temperature=0.1, max_retries=2)
-
 # --- ENHANCED & FOCUSED PROMPT ---
 # The prompt is updated to demand a more comprehensive summary.
 _prompt = ChatPromptTemplate.from_messages(
@@ -72,13 +69,12 @@ Article to process:
     ]
 )
 
-# Use function_calling for more robust structured output
-_chain = _prompt | _model.with_structured_output(
-    ArticleNormalizationEntry, method="function_calling"
-)
+# Use a low temperature for deterministic, factual extraction.
+# Cheap model first; an empty summary or invalid output escalates to the large one.
+_model = ModelCascade("normalize", _prompt, ArticleNormalizationEntry, temperature=0.1)
 
 
-def normalize_article(state: GraphState) -> GraphState:
+async def normalize_article(state: GraphState) -> GraphState:
     print(state)
     # The function now expects 'title' to be in the input state.
     url: str = state["url"]
@@ -88,7 +84,10 @@ def normalize_article(state: GraphState) -> GraphState:
     image_url: str = state["image_url"]
     provider: str = state["provider"]
     # 1) LLM normalization (summary, published_at, lang)
-    norm = _chain.invoke({"article": article_text})
+    norm = await _model.ainvoke(
+        {"article": article_text},
+        check=lambda out: None if (out.summary or "").strip() else "empty summary",
+    )
 
     # 2) Derived fields
     host = urlparse(url).netloc.lower()
@@ -99,7 +98,7 @@ def normalize_article(state: GraphState) -> GraphState:
 
     # 3) Embedding from title + summary
     combined_text = f"{title or ''}\n\n{norm.summary or ''}"
-    content_emb = embed_text(combined_text) if (title or norm.summary) else None
+    content_emb = await aembed_text(combined_text) if (title or norm.summary) else None
 
     # 4) Final entry
     entry = ArticleEntry(
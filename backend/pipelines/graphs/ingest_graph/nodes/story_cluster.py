@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import select
+
+from backend.db.models import Article
+from backend.db.session import AsyncSessionLocal
+from backend.pipelines.graphs.ingest_graph.nodes.impact_gate import guess_facts
+from backend.pipelines.graphs.ingest_graph.state import GraphState
+from backend.repositories.analysis import attach_to_cluster, get_analysis_packet
+from backend.services.verify_output import extract_numbers, number_supported
+
+# A semantic duplicate triggers re-analysis of its story when it brings at least
+# this many new figures / tickers / markets, or when the packet is older than the interval.
+CLUSTER_MIN_NEW_FACTS = int(os.getenv("CLUSTER_MIN_NEW_FACTS", "2"))
+CLUSTER_REFRESH_HOURS = float(os.getenv("CLUSTER_REFRESH_HOURS", "6"))
+# Stories whose copies are held until their analysis is stored (oldest dropped first).
+CLUSTER_PENDING_MAX = int(os.getenv("CLUSTER_PENDING_MAX", "1000"))
+
+ATTACHED = "attached"
+REFRESH = "refresh"
+
+stats = {ATTACHED: 0, REFRESH: 0, "orphan": 0, "pending_attached": 0}
+
+# ref_url -> [(copy_url, citation)] for copies of stories without an analysis yet.
+_pending: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+
+
+def _hold(ref_url: str, copy_url: str, citation: Dict[str, Any]) -> None:
+    copies = _pending.pop(ref_url, [])
+    if all(url != copy_url for url, _ in copies):
+        copies.append((copy_url, citation))
+    _pending[ref_url] = copies
+    while len(_pending) > CLUSTER_PENDING_MAX:
+        dropped = next(iter(_pending))
+        print(f"story_cluster: dropping {len(_pending.pop(dropped))} unattached copies of {dropped}")
+
+
+async def attach_pending(session, ref_url: str) -> int:
+    """Attach copies held for `ref_url` now that its analysis row exists (caller commits)."""
+    copies = _pending.pop(ref_url, [])
+    for copy_url, citation in copies:
+        await attach_to_cluster(session, ref_url, copy_url, citation)
+    stats["pending_attached"] += len(copies)
+    return len(copies)
+
+
+def _loads(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def new_facts(copy_row: Dict[str, Any], ref_summary: str, existing: Dict[str, Any]) -> List[str]:
+    """Figures, tickers and markets in the copy that neither the story's article nor its packet has."""
+    copy_text = f"{copy_row.get('title') or ''}\n{copy_row.get('summary') or ''}"
+    known_text = "\n".join(
+        [ref_summary or "", existing.get("executive_summary") or ""] + list(_loads(existing.get("bullets")) or [])
+    )
+    known_values = [(raw, scaled) for _, raw, scaled, _ in extract_numbers(known_text)]
+    known_values += [
+        (float(v), float(v)) for v in (_loads(existing.get("numerics")) or {}).values()
+        if isinstance(v, (int, float)) and not isinstance(v, bool)
+    ]
+
+    found = []
+    for claim in extract_numbers(copy_text):
+        literal = claim[0]
+        # Bare numbers are mostly dates and counts; figures carry a unit, % or currency.
+        material = "$" in literal or "%" in literal or any(c.isalpha() for c in literal)
+        if material and not number_supported(claim, known_values):
+            found.append(f"figure {literal}")
+    facts = guess_facts(copy_row.get("title") or "", copy_row.get("summary") or "")
+    found += [f"ticker {t}" for t in facts.tickers if t not in (existing.get("tickers") or []) and t not in known_text]
+    found += [f"market {m}" for m in facts.markets if m not in (existing.get("markets") or [])]
+    return found
+
+
+async def node_cluster(state: GraphState) -> GraphState:
+    """
+    Semantic duplicate: attach the copy to the story it duplicates instead of analysing
+    it again. Sets `cluster.refresh` when the story should be re-analysed with the copy.
+    """
+    copy_row = state["article_row"]
+    ref_url = state["insert_ref_url"]
+    citation = {
+        "url": copy_row["url"],
+        "title": copy_row.get("title"),
+        "published_at": str(copy_row.get("published_at")),
+    }
+    async with AsyncSessionLocal() as session:
+        existing = await get_analysis_packet(session, ref_url)
+        ref = (await session.execute(select(Article).where(Article.url == ref_url))).scalar_one_or_none()
+        if existing is None or ref is None:
+            # The story has no analysis yet (still in flight, or gated to store-only): hold
+            # the copy and attach it if and when the story's packet is stored.
+            stats["orphan"] += 1
+            _hold(ref_url, copy_row["url"], citation)
+            print(f"story_cluster: no analysis for {ref_url} yet, holding {copy_row['url']}")
+            return {"cluster": {"ref_url": ref_url, "refresh": None}}
+
+        await attach_to_cluster(session, ref_url, copy_row["url"], citation)
+        await session.commit()
+
+    # Packets stored before analysed_at existed fall back to the article's fetch time.
+    analysed_at = (existing.get("analysed_at") or ref.fetched_at).timestamp()
+    added = new_facts(copy_row, ref.summary or "", existing)
+    refresh = None
+    if len(added) >= CLUSTER_MIN_NEW_FACTS:
+        refresh = "new facts: " + ", ".join(added[:5])
+    elif time.time() - analysed_at >= CLUSTER_REFRESH_HOURS * 3600:
+        refresh = f"packet older than {CLUSTER_REFRESH_HOURS:g}h"
+
+    stats[REFRESH if refresh else ATTACHED] += 1
+    print(f"story_cluster: {copy_row['url']} -> {ref_url}" + (f", re-analysing ({refresh})" if refresh else ""))
+    return {
+        "cluster": {
+            "ref_url": ref_url,
+            "refresh": refresh,
+            "ref_row": {
+                "url": ref.url,
+                "title": ref.title,
+                "summary": ref.summary,
+                "published_at": ref.published_at,
+                "source_domain": ref.source_domain,
+            },
+        }
+    }
+
+
+def route_after_cluster(state: GraphState) -> str:
+    return REFRESH if state["cluster"].get("refresh") else ATTACHED
@@ -13,8 +13,12 @@ class GraphState(TypedDict):
     insert_ref_url: str
     insert_article_id: int
     insert_metric: Any
+    inserted_urls: List[str]
     related_articles: List[Dict[str, Any]]
+    gate: Dict[str, Any]
+    cluster: Dict[str, Any]
     analysis: Dict[str, Any]
+    entities_news: List[Dict[str, str]]
     verified: bool
     verification_issues: List[str]
     alerted: bool
@@ -7,15 +7,13 @@ import time
 import re
 
 
-from backend.pipelines.graphs.web_scrapper_graph.state import InitState, OverallState
+from backend.pipelines.graphs.web_scrapper_graph.sources import BROWSER, SourceAdapter, register_source
+from backend.services.browser_pool import PageReadiness
 
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, BrowserConfig
 from langchain_openai import ChatOpenAI
 from PIL import Image
 import re
 
-COOKIES_FILE = "cookies.json"
-
 import re
 
 def parse_ft_markets(md: str):
@@ -55,36 +53,17 @@ def parse_ft_markets(md: str):
     return articles
 
 
-async def load_cookies():
-    try:
-        with open(COOKIES_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("No cookies.json found, running without cookies")
-        return None
-
-async def main(state: InitState) -> OverallState:
-    cookies = await load_cookies()
-    browser_cfg = BrowserConfig(headless=True, user_agent=(
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) " "AppleWebKit/537.36 (KHTML, like Gecko) " "Chrome/120.0 Safari/537.36"),
-                                cookies=cookies, viewport_width=1920, viewport_height=1080,)
-
-    async with AsyncWebCrawler(config=browser_cfg) as crawler:
-        script = """
-            WAIT 10
-            IF (EXISTS `#onetrust-accept-btn-handler`) THEN CLICK `#onetrust-accept-btn-handler`
-            WAIT 5
-            """
-        run_cfg = CrawlerRunConfig(c4a_script=script, exclude_external_links=True)
-        result = await crawler.arun(url=state["link"], config=run_cfg)
-        print(result.markdown)
-        articles = parse_ft_markets(result.markdown)
-        articles = articles[:2]
-        print(articles)
-        return articles
-
-
-
-def get_posts_hardcoded_ft(state: InitState) -> OverallState:
-    result = asyncio.run(main(state))
-    return {"articles": result, "article_index": 0}
+register_source(SourceAdapter(
+    name="financial_times",
+    domains=("ft.com",),
+    strategy=BROWSER,
+    parser=parse_ft_markets,
+    limit=slice(0, 2),
+    # parse_ft_markets needs the "More Market" stream and the pager; was WAIT 10 + WAIT 5.
+    readiness=PageReadiness(
+        ready_selector=".o-teaser__heading, [data-trackable='heading-link']",
+        min_matches=10,
+        timeout_ms=10000,
+        baseline_wait_s=15,
+    ),
+))
@@ -16,5 +16,5 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-def gather_articles(state: OverallState):
+async def gather_articles(state: OverallState):
     return {}
@@ -0,0 +1,19 @@
+from backend.pipelines.graphs.web_scrapper_graph.state import InitState, OverallState
+from backend.pipelines.graphs.web_scrapper_graph.sources import resolve_source, fetch_listing
+
+# Importing the source modules registers their adapters.
+from backend.pipelines.graphs.web_scrapper_graph.nodes import cnbc, financial_times, hardcoded_website, yahoo_finance  # noqa: F401
+
+
+async def get_posts(state: InitState) -> OverallState:
+    adapter = resolve_source(state["link"])
+    if adapter is None:
+        print(f"No source adapter registered for {state['link']}")
+        return {"articles": [], "article_index": 0}
+
+    try:
+        articles = await fetch_listing(adapter, state["link"])
+    except Exception as e:
+        print(f"{adapter.name}: listing failed for {state['link']}: {e}")
+        articles = []
+    return {"articles": articles, "article_index": 0}
@@ -7,15 +7,13 @@ import time
 import re
 
 
-from backend.pipelines.graphs.web_scrapper_graph.state import InitState, OverallState
+from backend.pipelines.graphs.web_scrapper_graph.sources import BROWSER, SourceAdapter, register_source
+from backend.services.browser_pool import PageReadiness
 
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, BrowserConfig
 from langchain_openai import ChatOpenAI
 from PIL import Image
 import re
 
-COOKIES_FILE = "cookies.json"
-
 def parse_reuters_news(md: str):
     articles = []
 
@@ -65,37 +63,22 @@ def parse_reuters_markdown(md: str):
         })
     return news
 
-async def load_cookies():
-    try:
-        with open(COOKIES_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("No cookies.json found, running without cookies")
-        return None
-
-async def main(state: InitState) -> OverallState:
-    cookies = await load_cookies()
-    browser_cfg = BrowserConfig(headless=True, user_agent=(
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) " "AppleWebKit/537.36 (KHTML, like Gecko) " "Chrome/120.0 Safari/537.36"),
-                                cookies=cookies)
-
-    async with AsyncWebCrawler(config=browser_cfg) as crawler:
-        script = """
-            WAIT 5
-            IF (EXISTS `#onetrust-accept-btn-handler`) THEN CLICK `#onetrust-accept-btn-handler`
-            WAIT 3
-            """
-        run_cfg = CrawlerRunConfig(c4a_script=script, exclude_external_links=True)
-        result = await crawler.arun(url=state["link"], config=run_cfg)
-        articles = parse_reuters_news(result.markdown)
-        articles = articles[3:6]
-        return articles
-
-
-
-
-
-def get_posts_hardcoded(state: InitState) -> OverallState:
-    result = asyncio.run(main(state))
-    return {"articles": result, "article_index": 0}
 
+register_source(SourceAdapter(
+    name="reuters",
+    domains=("reuters.com",),
+    strategy=BROWSER,
+    parser=parse_reuters_news,
+    limit=slice(3, 6),
+    # Listing cards are server-rendered; was WAIT 5 + WAIT 3.
+    readiness=PageReadiness(
+        ready_selector='[data-testid="MediaStoryCard"], [data-testid="Heading"]',
+        min_matches=6,
+        baseline_wait_s=8,
+    ),
+    article_readiness=PageReadiness(
+        ready_selector='[data-testid^="paragraph-"], article p',
+        min_matches=3,
+        baseline_wait_s=15,
+    ),
+))
@@ -14,6 +14,9 @@ from backend.pipelines.graphs.web_scrapper_graph.state import InitState, Overall
 from dotenv import load_dotenv
 
 from backend.utils.helpers import extract_text_inside_tags
+from backend.services import article_extraction
+from backend.services.llm import estimate_tokens, llm
+from backend.services.llm_cascade import ModelCascade
 
 import asyncio
 import base64
@@ -24,7 +27,6 @@ import time
 
 from backend.pipelines.graphs.web_scrapper_graph.state import InitState, OverallState
 
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, BrowserConfig
 from langchain_openai import ChatOpenAI
 from PIL import Image
 import re
@@ -33,6 +35,8 @@ load_dotenv()
 
 # Maximum number of attempts to get a valid response
 MAX_ATTEMPTS = 3
+# First attempt on the cheap model; a failed parse retries on the large one.
+_cascade = ModelCascade("parsed_struct_text")
 
 # System prompt as a separate constant
 SYSTEM_PROMPT = """
@@ -83,41 +87,21 @@ Example:
 </answer>
 """
 
-COOKIES_FILE = "cookies.json"
+async def parsed_struct_text(state: SubState) -> OverallState:
+    # Rule-based fast path: the listing already gave us url/title/image/date.
+    known = {}
+    if isinstance(state["article"], dict):
+        known, confidence = article_extraction.extract_article(state["article"])
+        if confidence >= article_extraction.EXTRACTION_MIN_CONFIDENCE:
+            article_extraction.stats["rule"] += 1
+            return {"new_articles": [known]}
+        print(f"parsed_struct_text: low extraction confidence {confidence} for {known['url']}, using LLM")
+    article_extraction.stats["llm"] += 1
+    print(f"parsed_struct_text: LLM fallback rate {article_extraction.fallback_rate():.0%}")
 
-
-async def load_cookies():
-    try:
-        with open(COOKIES_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("No cookies.json found, running without cookies")
-        return None
-
-
-async def get_news_text(link):
-    cookies = await load_cookies()
-    browser_cfg = BrowserConfig(headless=True, user_agent=(
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) " "AppleWebKit/537.36 (KHTML, like Gecko) " "Chrome/120.0 Safari/537.36"),
-                                cookies=cookies)
-
-    async with AsyncWebCrawler(config=browser_cfg) as crawler:
-        script = """
-                    WAIT 5
-                    IF (EXISTS `#onetrust-accept-btn-handler`) THEN CLICK `#onetrust-accept-btn-handler`
-                    WAIT 3
-                """
-        run_cfg = CrawlerRunConfig(c4a_script=script, exclude_external_links=True)
-        result = await crawler.arun(url=link, config=run_cfg)
-        return result.markdown
-
-
-def parsed_struct_text(state: SubState) -> OverallState:
-    model = ChatOpenAI(model="gpt-4o")
     for attempt in range(1, MAX_ATTEMPTS + 1):
+        model = _cascade.model_for(attempt - 1)
         try:
-            # article_parsed = asyncio.run(get_news_text(state["article"]["link"]))
-            # state["article"]["main_text"] = article_parsed
             article_text = (
                 state["article"]
                 if isinstance(state["article"], str)
@@ -133,7 +117,10 @@ def parsed_struct_text(state: SubState) -> OverallState:
 
             # Invoke the model
             assistant_chain = assistant_prompt | model
-            raw_response = assistant_chain.invoke({})
+            raw_response = await llm.ainvoke(
+                assistant_chain, {}, name=f"parsed_struct_text[{model.model_name}]",
+                tokens=estimate_tokens(article_text),
+            )
 
             # Extract hypothesis and validate
             answer = extract_text_inside_tags(raw_response.content, "answer")
@@ -144,6 +131,8 @@ def parsed_struct_text(state: SubState) -> OverallState:
                 answer_dict = json.loads(answer)
             except json.JSONDecodeError as je:
                 raise ValueError(f"Failed to parse JSON from answer: {je}")
+            # Listing fields fill in whatever the LLM omitted.
+            answer_dict = {**{k: v for k, v in known.items() if k != "main_text"}, **answer_dict}
             result_state = {
                 "new_articles": [answer_dict],
             }
@@ -154,6 +143,8 @@ def parsed_struct_text(state: SubState) -> OverallState:
             print(f"Attempt {attempt}/{MAX_ATTEMPTS} in parsed_struct_text failed: {e}")
             if attempt == MAX_ATTEMPTS:
                 raise
+            if _cascade.model_for(attempt) is not model:
+                _cascade.escalated(f"invalid output: {e}", attempt - 1)
         except Exception as e:
             print(f"Attempt {attempt}/{MAX_ATTEMPTS} in parsed_struct_text failed: {e}")
             if attempt == MAX_ATTEMPTS:
@@ -5,6 +5,7 @@ from dotenv import load_dotenv
 
 
 import asyncio
+from typing import Optional
 import base64
 import io
 import json
@@ -14,49 +15,58 @@ import re
 
 
 from backend.pipelines.graphs.web_scrapper_graph.state import InitState, OverallState
+from backend.services.article_fetcher import article_fetcher
+from backend.services.fetch_limiter import fetch_limiter, FETCH_TIMEOUT_S
+from backend.services.url_index import url_index
+from backend.services.title_dedup import title_index
+from backend.pipelines.graphs.web_scrapper_graph.sources import resolve_source
 
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, BrowserConfig
 from langchain_openai import ChatOpenAI
 from PIL import Image
 import re
 
 load_dotenv()
 
-COOKIES_FILE = "cookies.json"
 
+async def get_news_text(link, readiness=None):
+    # Plain HTTP when the page is server-rendered, headless browser otherwise.
+    return await article_fetcher.fetch(link, readiness)
 
-async def load_cookies():
+
+async def _fetch_body(article: dict, adapter=None) -> Optional[dict]:
+    link = article["link"]
+    per_domain = adapter.max_concurrency if adapter else None
+    readiness = adapter.article_readiness if adapter else None
     try:
-        with open(COOKIES_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("No cookies.json found, running without cookies")
+        async with fetch_limiter.slot(link, per_domain=per_domain):
+            text = await asyncio.wait_for(get_news_text(link, readiness), timeout=FETCH_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        print(f"send_article: timed out after {FETCH_TIMEOUT_S}s fetching {link}")
         return None
-
-
-async def get_news_text(link):
-    cookies = await load_cookies()
-    browser_cfg = BrowserConfig(headless=True, user_agent=(
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) " "AppleWebKit/537.36 (KHTML, like Gecko) " "Chrome/120.0 Safari/537.36"),
-                                cookies=cookies)
-
-    async with AsyncWebCrawler(config=browser_cfg) as crawler:
-        script = """
-                WAIT 10
-                IF (EXISTS `#onetrust-accept-btn-handler`) THEN CLICK `#onetrust-accept-btn-handler`
-                IF (EXISTS `button:has-text("Alle akzeptieren")`) THEN CLICK `button:has-text("Alle akzeptieren")`
-                WAIT 5
-
-                """
-        run_cfg = CrawlerRunConfig(c4a_script=script, exclude_external_links=True)
-        result = await crawler.arun(url=link, config=run_cfg)
-        return result.markdown
-
-def send_article(state: OverallState):
-    sends = []
-    for a in state["articles"]:
-        article_parsed = asyncio.run(get_news_text(a["link"]))
-        a["main_text"] = article_parsed
-        sends.append(Send("Parse Structured Post", {"article": a}))
-
-    return sends
\ No newline at end of file
+    except Exception as e:
+        print(f"send_article: failed to fetch {link}: {e}")
+        return None
+    if not text or not text.strip():
+        print(f"send_article: empty body for {link}")
+        return None
+    return {**article, "main_text": text}
+
+
+async def send_article(state: OverallState):
+    # Known URLs never reach the crawler or the LLM.
+    articles = await url_index.filter_new(state["articles"])
+    print(f"send_article: {len(articles)}/{len(state['articles'])} links are new")
+    # Same story already listed by another source (syndicated wire copy).
+    articles, later = await title_index.filter(articles)
+    st = title_index.stats
+    print(
+        f"send_article: title dedup so far {st['duplicates']} duplicates, {st['crawls_saved']} crawls saved, "
+        f"~{st['llm_calls_saved_est']:.0f} LLM calls saved (estimate)"
+    )
+
+    # Fetch all bodies at once; limits live in fetch_limiter, failed links are dropped.
+    adapter = resolve_source(state["link"])
+    fetched = await asyncio.gather(*(_fetch_body(a, adapter) for a in articles))
+    if later:
+        fetched += await asyncio.gather(*(_fetch_body(a, adapter) for a in later))
+    return [Send("Parse Structured Post", {"article": a}) for a in fetched if a is not None]
@@ -1,9 +1,8 @@
 import json
 import re
 from bs4 import BeautifulSoup
-import feedparser
 
-from backend.pipelines.graphs.web_scrapper_graph.state import InitState, OverallState
+from backend.pipelines.graphs.web_scrapper_graph.sources import RSS, SourceAdapter, register_source
 
 
 def parse_yahoo_finance_news(html_content: str):
@@ -89,52 +88,38 @@ def parse_yahoo_finance_markdown(md: str):
 
     return articles
 
-def scrape_yahoo_finance_rss() -> list:
-    """Scrape Yahoo Finance using RSS feed - much more reliable than browser scraping"""
-    try:
-        # RSS feed URL
-        rss_url = "https://finance.yahoo.com/news/rssindex"
-
-        feed = feedparser.parse(rss_url)
-        articles = []
-
-        for entry in feed.entries[2:10]:
-            title = entry.title
-            link = entry.link
-
-            image_url = None
-            if hasattr(entry, 'media_content') and entry.media_content:
-                image_url = entry.media_content[0].get('url')
-            elif hasattr(entry, 'enclosures') and entry.enclosures:
-                image_url = entry.enclosures[0].href
-
-            date = entry.published if hasattr(entry, 'published') else None
+def parse_yahoo_finance_rss(entries) -> list:
+    articles = []
 
-            articles.append({
-                "title": title.strip(),
-                "link": link.strip(),
-                "image": image_url,
-                "date": date
-            })
+    for entry in entries:
+        title = entry.title
+        link = entry.link
 
-        print(f"Yahoo Finance RSS: Found {len(articles)} articles")
-        return articles
+        image_url = None
+        if hasattr(entry, 'media_content') and entry.media_content:
+            image_url = entry.media_content[0].get('url')
+        elif hasattr(entry, 'enclosures') and entry.enclosures:
+            image_url = entry.enclosures[0].href
 
-    except Exception as e:
-        print(f"Error scraping Yahoo Finance RSS: {e}")
-        return []
+        date = entry.published if hasattr(entry, 'published') else None
 
+        articles.append({
+            "title": title.strip(),
+            "link": link.strip(),
+            "image": image_url,
+            "date": date
+        })
 
+    print(f"Yahoo Finance RSS: Found {len(articles)} articles")
+    return articles
 
-def get_posts_hardcoded_yahoo(state: InitState) -> OverallState:
-    print("Yahoo Finance: Using RSS feed instead of website scraping")
-    result = scrape_yahoo_finance_rss()
 
-    return {
-        "link": "https://finance.yahoo.com/news/rssindex",
-        "articles": result,
-        "new_articles": [],
-        "screenshot": "",
-        "parsed_website": "yahoo_finance_rss",
-        "article_index": 0
-    }
+# RSS is much more reliable than browser scraping for Yahoo Finance
+register_source(SourceAdapter(
+    name="yahoo_finance",
+    domains=("yahoo.com",),
+    strategy=RSS,
+    parser=parse_yahoo_finance_rss,
+    listing_url="https://finance.yahoo.com/news/rssindex",
+    limit=slice(2, 10),
+))
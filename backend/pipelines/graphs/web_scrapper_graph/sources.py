@@ -0,0 +1,98 @@
+# web_scrapper_graph/sources.py
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from crawl4ai import CrawlerRunConfig
+
+from backend.services.browser_pool import USER_AGENT, PageReadiness, browser_pool
+from backend.services.feed_cache import feed_cache
+from backend.services.session_manager import cookie_header, session_manager
+
+RSS = "rss"
+HTTP = "http"
+BROWSER = "browser"
+
+
+@dataclass(frozen=True)
+class SourceAdapter:
+    """
+    How to list articles for one news source.
+
+    strategy: RSS    -> parser(feed entries), `limit` slices the entries before parsing
+              HTTP   -> parser(html of the listing page), `limit` slices the parsed list
+              BROWSER-> parser(markdown rendered by the browser pool), `limit` as for HTTP
+    Parsers may block (BeautifulSoup, og:image lookups); they run in a worker thread.
+    readiness / article_readiness: when a browser-rendered listing / article page
+    of this source can be read (see PageReadiness).
+    """
+
+    name: str
+    domains: Tuple[str, ...]
+    strategy: str
+    parser: Callable[..., List[dict]]
+    listing_url: Optional[str] = None
+    limit: slice = slice(None)
+    readiness: Optional[PageReadiness] = None
+    article_readiness: Optional[PageReadiness] = None
+    max_concurrency: int = 2
+    poll_interval: int = 600
+
+    def matches(self, link: str) -> bool:
+        host = urlparse(link).netloc.lower()
+        return any(host == d or host.endswith("." + d) for d in self.domains)
+
+
+_REGISTRY: Dict[str, SourceAdapter] = {}
+
+
+def register_source(adapter: SourceAdapter) -> SourceAdapter:
+    _REGISTRY[adapter.name] = adapter
+    return adapter
+
+
+def resolve_source(link: str) -> Optional[SourceAdapter]:
+    for adapter in _REGISTRY.values():
+        if adapter.matches(link or ""):
+            return adapter
+    return None
+
+
+def registered_sources() -> List[SourceAdapter]:
+    return list(_REGISTRY.values())
+
+
+async def fetch_listing(adapter: SourceAdapter, link: str) -> List[dict]:
+    url = adapter.listing_url or link
+
+    if adapter.strategy == RSS:
+        entries = await asyncio.to_thread(feed_cache.fetch, url)
+        if entries is None:
+            print(f"{adapter.name}: feed unchanged since last cycle")
+            return []
+        return await asyncio.to_thread(adapter.parser, entries[adapter.limit])
+
+    if adapter.strategy == HTTP:
+        headers = {"User-Agent": USER_AGENT}
+        cookie = cookie_header(await session_manager.cookies_for(url), url)
+        if cookie:
+            headers["Cookie"] = cookie
+        resp = await asyncio.to_thread(requests.get, url, headers=headers, timeout=20)
+        resp.raise_for_status()
+        articles = await asyncio.to_thread(adapter.parser, resp.text)
+        return articles[adapter.limit]
+
+    if adapter.strategy == BROWSER:
+        if adapter.readiness is not None:
+            run_cfg = adapter.readiness.run_config(exclude_external_links=True)
+        else:
+            run_cfg = CrawlerRunConfig(exclude_external_links=True)
+        result = await browser_pool.crawl(url, run_cfg, cookies=await session_manager.cookies_for(url))
+        articles = await asyncio.to_thread(adapter.parser, result.markdown or "")
+        return articles[adapter.limit]
+
+    raise ValueError(f"Unknown listing strategy {adapter.strategy!r} for {adapter.name}")
@@ -14,6 +14,8 @@ class OverallState(TypedDict):
     link: str
     articles: list
     new_articles: Annotated[list[dict], operator.add]
+    # URLs the ingest runs actually stored (set by the ingest graph's insert node).
+    inserted_urls: Annotated[list[str], operator.add]
     screenshot: str
     parsed_website: str
     article_index: int
@@ -21,6 +23,8 @@ class OverallState(TypedDict):
 
 class OutputState(TypedDict):
     placeholder: Annotated[list[dict], operator.add]
+    new_articles: Annotated[list[dict], operator.add]
+    inserted_urls: Annotated[list[str], operator.add]
 
 
 class SubState(TypedDict):
@@ -1,26 +1,94 @@
 # repositories/analysis.py
 from __future__ import annotations
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from backend.services.sms_service import send_sms_alert
 
 
+# On refresh the analysed columns are replaced; cluster_ids and citations keep every copy
+# attached so far (also ones attached while the refresh ran) and add the new ones;
+# `important` keeps any manual flag from the UI and picks up a newly reached threshold.
+_REFRESH = """
+            ON CONFLICT (article_url) DO UPDATE SET
+              cluster_ids = ARRAY(
+                SELECT u FROM unnest(COALESCE(article_analysis.cluster_ids, '{}') || COALESCE(EXCLUDED.cluster_ids, '{}'))
+                  WITH ORDINALITY AS t(u, i)
+                GROUP BY u ORDER BY min(i)
+              ),
+              citations = (
+                COALESCE(article_analysis.citations::jsonb, '[]'::jsonb) || COALESCE((
+                  SELECT jsonb_agg(c) FROM jsonb_array_elements(EXCLUDED.citations::jsonb) AS c
+                  WHERE NOT EXISTS (
+                    SELECT 1 FROM jsonb_array_elements(COALESCE(article_analysis.citations::jsonb, '[]'::jsonb)) AS e
+                    WHERE e->>'url' = c->>'url'
+                  )
+                ), '[]'::jsonb)
+              )::json,
+              event_type = EXCLUDED.event_type,
+              tickers = EXCLUDED.tickers, companies = EXCLUDED.companies, sectors = EXCLUDED.sectors,
+              geos = EXCLUDED.geos, numerics = EXCLUDED.numerics, impact_score = EXCLUDED.impact_score,
+              confidence = EXCLUDED.confidence, novelty = EXCLUDED.novelty,
+              executive_summary = EXCLUDED.executive_summary, bullets = EXCLUDED.bullets,
+              actions = EXCLUDED.actions, risks = EXCLUDED.risks,
+              markets = EXCLUDED.markets, analysed_at = EXCLUDED.analysed_at,
+              important = article_analysis.important OR EXCLUDED.important;
+"""
+
+async def get_analysis_packet(session: Session, article_url: str) -> Optional[Dict[str, Any]]:
+    result = await session.execute(
+        text(
+            """
+            SELECT cluster_ids, tickers, numerics, markets, executive_summary, bullets, analysed_at
+            FROM article_analysis WHERE article_url = :url
+            """
+        ),
+        {"url": article_url},
+    )
+    row = result.mappings().first()
+    return dict(row) if row else None
+
+
+async def attach_to_cluster(
+    session: Session, article_url: str, copy_url: str, citation: Dict[str, Any]
+) -> None:
+    """Record another outlet's copy of an analysed story: its URL in cluster_ids and a citation."""
+    await session.execute(
+        text(
+            """
+            UPDATE article_analysis
+            SET cluster_ids = array_append(COALESCE(cluster_ids, '{}'), :copy_url),
+                citations = (COALESCE(citations::jsonb, '[]'::jsonb) || CAST(:citation AS jsonb))::json
+            WHERE article_url = :url AND NOT (:copy_url = ANY(COALESCE(cluster_ids, '{}')))
+            """
+        ),
+        {"url": article_url, "copy_url": copy_url, "citation": json.dumps([citation])},
+    )
+
+
 async def insert_analysis_packet(
-    session: Session, article_url: str, packet: Dict[str, Any], cluster_urls: list[str]
+    session: Session,
+    article_url: str,
+    packet: Dict[str, Any],
+    cluster_urls: list[str],
+    refresh: bool = False,
 ) -> None:
+    """`refresh` replaces an existing packet for the URL instead of keeping it."""
+    conflict = _REFRESH if refresh else "ON CONFLICT (article_url) DO NOTHING;"
     await session.execute(
         text(
             """
             INSERT INTO article_analysis
               (article_url, cluster_ids, event_type, tickers, companies, sectors, geos, numerics,
-               impact_score, confidence, novelty, executive_summary, bullets, actions, risks, citations, important, markets)
+               impact_score, confidence, novelty, executive_summary, bullets, actions, risks, citations, important, markets,
+               analysed_at)
             VALUES
               (:url, :cluster_ids, :event_type, :tickers, :companies, :sectors, :geos, :numerics,
-               :impact_score, :confidence, :novelty, :executive_summary, :bullets, :actions, :risks, :citations, :important, :markets)
-            ON CONFLICT (article_url) DO NOTHING;
+               :impact_score, :confidence, :novelty, :executive_summary, :bullets, :actions, :risks, :citations, :important, :markets,
+               now())
             """
+            + conflict
         ),
         {
             "url": article_url,
@@ -11,13 +11,14 @@ from backend.db.session import AsyncSessionLocal
 from backend.db.session import SessionLocal
 from backend.db.models import Article
 from backend.db.types import Vector1536
-from backend.services.dedup import hamming_distance
-from backend.services.embeddings import embed_text
+from backend.services.dedup import LOOKBACK_DAYS, hamming_distance
+from backend.services.simhash_index import simhash_index
+from backend.services.vector_index import vector_index
+from backend.services.embeddings import aembed_text
 from backend.utils.helpers import utcnow, to_int
 
 HAMMING_THRESHOLD = 3
 EMBED_SIM_THRESHOLD = 0.92
-LOOKBACK_DAYS = 7
 MAX_CANDIDATES = 2000
 TOPK_EMB = 10
 
@@ -37,6 +38,13 @@ async def _fetch_recent_hashes(session: Session):
 async def _find_near_duplicate_simhash(
     session: Session, new_hash: int
 ) -> Optional[Tuple[str, int]]:
+    try:
+        await simhash_index.ensure_warm()
+    except Exception as e:
+        print(f"SimHash index unavailable, scanning recent rows instead: {e}")
+    if simhash_index.warmed:
+        return simhash_index.nearest(new_hash, HAMMING_THRESHOLD)
+
     for url, h in await _fetch_recent_hashes(session):
         existing = to_int(h)
         if existing is None:
@@ -50,11 +58,19 @@ async def _find_near_duplicate_simhash(
 
 
 async def _find_semantic_duplicate_db(
-    session: Session, combined_text: str
+    session: Session, combined_text: str, emb=None
 ) -> Optional[Tuple[str, float]]:
-    emb = embed_text(combined_text)
+    # normalize_article already embedded the same title + summary text.
+    if emb is None:
+        emb = await aembed_text(combined_text)
     cutoff = utcnow() - timedelta(days=LOOKBACK_DAYS)
 
+    if vector_index.ready:
+        hit = vector_index.top1(emb, since=cutoff.timestamp())
+        if hit and hit[1] >= EMBED_SIM_THRESHOLD:
+            return hit
+        return None
+
     distance = Article.content_emb.op("<=>")(cast(bindparam("emb"), Vector1536()))
     # FIX: Use literal(1) to prevent SQLAlchemy from applying the vector's
     # bind processor to the integer, which caused the TypeError.
@@ -104,7 +120,9 @@ async def insert_article(
                 f"{article_row.get('title') or ''}\n\n{article_row.get('summary') or ''}"
             )
             if combined.strip():
-                sem = await _find_semantic_duplicate_db(session, combined)
+                sem = await _find_semantic_duplicate_db(
+                    session, combined, article_row.get("content_emb")
+                )
                 if sem:
                     dup_url, sim = sem
                     stmt = select(Article.id).where(Article.url == dup_url)
@@ -114,7 +132,7 @@ async def insert_article(
 
                 # 3) Store embedding if missing
                 if "content_emb" not in article_row or article_row["content_emb"] is None:
-                    article_row["content_emb"] = embed_text(combined)
+                    article_row["content_emb"] = await aembed_text(combined)
 
             # 4) Insert (PK url prevents exact dup)
             article = Article(**article_row)
@@ -122,6 +140,8 @@ async def insert_article(
             await session.flush()
             article_id = article.id
             await session.commit()
+            simhash_index.add(article_row["url"], new_hash)
+            vector_index.add(article_row["url"], article_row.get("content_emb"), article_row)
             return ("inserted", None, None, article_id)
 
         except IntegrityError:
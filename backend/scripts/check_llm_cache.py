@@ -0,0 +1,56 @@
+"""
+Check that replaying an analysis is served from the LLM response cache.
+
+Runs analyze_news twice on the same article; the second run must not miss the
+cache in any stage (extract, score, write). The first run may call the API.
+
+Usage:
+    export OPENAI_API_KEY=sk-...
+    python -m backend.scripts.check_llm_cache
+"""
+import asyncio
+from datetime import timedelta
+
+from backend.pipelines.graphs.ingest_graph.nodes.news_analysis import analyze_news
+from backend.services.llm_cache import llm_cache
+from backend.utils.helpers import utcnow
+
+STAGES = ("extract", "score", "write")
+
+ARTICLE = {
+    "url": "https://example.com/fed-cuts-rates",
+    "title": "Fed cuts rates by 25 basis points, signals more easing",
+    "summary": (
+        "The Federal Reserve lowered its benchmark rate by 25 basis points to 4.00%-4.25%. "
+        "Treasury yields fell and the dollar weakened; the S&P 500 rose 0.8%."
+    ),
+    "published_at": utcnow() - timedelta(hours=2),
+    "source_domain": "reuters.com",
+}
+
+
+def _counts():
+    return {s: dict(llm_cache.stats.get(s, {"hits": 0, "misses": 0})) for s in STAGES}
+
+
+async def main():
+    if not llm_cache.enabled:
+        raise SystemExit("LLM cache disabled (LLM_CACHE_PATH is empty)")
+    await analyze_news(ARTICLE, [], style_guide="", rag_snippets="")
+    before = _counts()
+    # The article is now a little older: recency must not leak into the cache keys.
+    await analyze_news(ARTICLE, [], style_guide="", rag_snippets="")
+    after = _counts()
+
+    ok = True
+    for stage in STAGES:
+        hits = after[stage]["hits"] - before[stage]["hits"]
+        misses = after[stage]["misses"] - before[stage]["misses"]
+        print(f"{stage:8s} hits +{hits} misses +{misses}")
+        ok = ok and hits >= 1 and misses == 0
+    print("OK: replay served from cache" if ok else "FAIL: replay missed the cache")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,29 @@
+"""
+Add article_analysis.analysed_at to an existing database.
+
+The column records when a packet was last (re-)analysed; story clustering uses it to
+decide when a story is due for a refresh. Run once per database, as the table owner,
+before deploying code that writes the column. Safe to re-run.
+
+Usage:
+    export DATABASE_URL=postgresql+psycopg://...
+    python -m backend.scripts.migrate_analysed_at
+"""
+import asyncio
+
+from sqlalchemy import text
+
+from backend.db.session import engine
+
+
+async def main():
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("ALTER TABLE article_analysis ADD COLUMN IF NOT EXISTS analysed_at TIMESTAMPTZ")
+        )
+    await engine.dispose()
+    print("article_analysis.analysed_at present")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,156 @@
+# services/article_extraction.py
+from __future__ import annotations
+
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from dateutil import parser as date_parser
+
+from backend.services.fetch_limiter import domain_of
+
+# Below this confidence parsed_struct_text falls back to the LLM.
+EXTRACTION_MIN_CONFIDENCE = float(os.getenv("EXTRACTION_MIN_CONFIDENCE", "0.75"))
+MIN_PARAGRAPH_CHARS = 80
+GOOD_TEXT_CHARS = 1200
+
+PROVIDERS = {
+    "reuters.com": "Reuters",
+    "cnbc.com": "CNBC",
+    "ft.com": "Financial Times",
+    "finance.yahoo.com": "Yahoo Finance",
+    "yahoo.com": "Yahoo Finance",
+    "bloomberg.com": "Bloomberg",
+    "wsj.com": "The Wall Street Journal",
+}
+
+_BOILERPLATE = re.compile(
+    r"(cookie|subscribe|sign in|sign up|log in|newsletter|advertisement|all rights reserved|"
+    r"privacy policy|terms of use|share this|follow us|skip to|read more|download the app|"
+    r"accept all|alle akzeptieren|manage preferences)",
+    re.IGNORECASE,
+)
+_IMAGE_MD = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK_MD = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_BARE_URL = re.compile(r"https?://\S+")
+_DATE_PATTERNS = (
+    re.compile(r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\.? \d{1,2},? \d{4}\b"),
+    re.compile(r"\b\d{1,2} (?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]* \d{4}\b"),
+    re.compile(r"\b\d{4}-\d{2}-\d{2}\b"),
+)
+
+stats = {"rule": 0, "llm": 0}
+
+
+def fallback_rate() -> float:
+    total = stats["rule"] + stats["llm"]
+    return stats["llm"] / total if total else 0.0
+
+
+def _clean_line(line: str) -> str:
+    line = _IMAGE_MD.sub("", line)
+    line = _LINK_MD.sub(r"\1", line)
+    line = _BARE_URL.sub("", line)
+    return re.sub(r"\s+", " ", line).strip(" #*>-|\t")
+
+
+def _paragraphs(text: str) -> List[str]:
+    paras = []
+    for block in re.split(r"\n\s*\n", text or ""):
+        raw_lines = [l for l in block.splitlines() if l.strip()]
+        if not raw_lines:
+            continue
+        # Blocks made mostly of links are navigation, not prose.
+        link_lines = sum(1 for l in raw_lines if _LINK_MD.search(l) and len(_clean_line(l)) < 60)
+        if link_lines > len(raw_lines) / 2:
+            continue
+        para = " ".join(_clean_line(l) for l in raw_lines).strip()
+        if para:
+            paras.append(para)
+    return paras
+
+
+def _is_content(para: str) -> bool:
+    if len(para) < MIN_PARAGRAPH_CHARS:
+        return False
+    if _BOILERPLATE.search(para) and len(para) < 300:
+        return False
+    return bool(re.search(r"[.!?\"”]$", para)) or para.count(". ") >= 1
+
+
+def main_content(text: str) -> Tuple[str, int]:
+    """Longest run of prose paragraphs (short headings inside the run are tolerated)."""
+    paras = _paragraphs(text)
+    best: List[str] = []
+    run: List[str] = []
+    gap = 0
+    for p in paras:
+        if _is_content(p):
+            run.append(p)
+            gap = 0
+        elif run and gap == 0 and len(p) < MIN_PARAGRAPH_CHARS and not _BOILERPLATE.search(p):
+            gap = 1
+        else:
+            if sum(map(len, run)) > sum(map(len, best)):
+                best = run
+            run, gap = [], 0
+    if sum(map(len, run)) > sum(map(len, best)):
+        best = run
+    return "\n\n".join(best), len(best)
+
+
+def parse_date(*candidates: Optional[str]) -> Optional[str]:
+    for c in candidates:
+        if not c:
+            continue
+        try:
+            return date_parser.parse(c, fuzzy=True).strftime("%B %d, %Y")
+        except (ValueError, OverflowError):
+            continue
+    return None
+
+
+def find_date(text: str) -> Optional[str]:
+    head = (text or "")[:4000]
+    for pattern in _DATE_PATTERNS:
+        m = pattern.search(head)
+        if m:
+            parsed = parse_date(m.group(0))
+            if parsed:
+                return parsed
+    return None
+
+
+def provider_for(url: str) -> str:
+    domain = domain_of(url)
+    for known, name in PROVIDERS.items():
+        if domain == known or domain.endswith("." + known):
+            return name
+    return domain.split(".")[-2].capitalize() if "." in domain else domain
+
+
+def extract_article(article: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+    """
+    Rule-based version of the parsed_struct_text LLM call.
+    Returns the article dict in the same shape plus a 0..1 confidence.
+    """
+    url = article.get("link") or article.get("url") or ""
+    title = (article.get("title") or "").strip()
+    body, n_paras = main_content(article.get("main_text") or "")
+    date = parse_date(article.get("date")) or find_date(article.get("main_text") or "")
+
+    confidence = 0.5 * min(1.0, len(body) / GOOD_TEXT_CHARS)
+    confidence += 0.2 * min(1.0, n_paras / 4)
+    confidence += 0.15 if title else 0.0
+    confidence += 0.15 if date else 0.0
+
+    result = {
+        "url": url,
+        "image_url": article.get("image") or "",
+        "provider": provider_for(url),
+        "title": title,
+        "main_text": body,
+    }
+    if date:
+        result["date"] = date
+    return result, round(confidence, 3)
@@ -0,0 +1,190 @@
+# services/article_fetcher.py
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from bs4 import BeautifulSoup
+from backend.services.browser_pool import PageReadiness, browser_pool
+from backend.services.fetch_limiter import domain_of
+from backend.services.http_client import get_http_client
+from backend.services.page_cache import HTML, MARKDOWN, page_cache
+from backend.services.session_manager import cookie_header, session_manager
+
+HTTP = "http"
+BROWSER = "browser"
+
+# Extracted text shorter than this is treated as a failed HTTP fetch.
+MIN_TEXT_CHARS = int(os.getenv("ARTICLE_MIN_TEXT_CHARS", "800"))
+# After this many consecutive HTTP failures a domain goes straight to the browser...
+HTTP_FAIL_LIMIT = 3
+# ...but HTTP is retried every N fetches in case the site changed.
+HTTP_REPROBE_EVERY = 50
+
+PAYWALL_MARKERS = (
+    "subscribe to continue",
+    "subscribe to read",
+    "already a subscriber",
+    "sign in to continue reading",
+    "to continue reading",
+    "this content is for subscribers",
+    "create a free account to",
+    "premium content",
+)
+JS_SHELL_MARKERS = (
+    "enable javascript",
+    "please turn on javascript",
+    "javascript is disabled",
+    "checking your browser",
+    "are you a robot",
+)
+
+# Generic article page: a few body paragraphs rendered (was WAIT 10 + WAIT 5).
+ARTICLE_READINESS = PageReadiness(
+    ready_selector="article p, main p, [itemprop='articleBody'] p",
+    min_matches=3,
+    baseline_wait_s=15,
+)
+
+_DROP_TAGS = ("script", "style", "noscript", "nav", "header", "footer", "aside", "form",
+              "svg", "iframe", "button", "figure")
+_BLOCK_TAGS = ("h1", "h2", "h3", "h4", "p", "li", "blockquote")
+
+
+def html_to_text(html: str) -> str:
+    """Plain text of the main content block of an article page."""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(_DROP_TAGS):
+        tag.decompose()
+
+    root = soup.find("article") or soup.find("main") or soup.body or soup
+    blocks = []
+    for el in root.find_all(_BLOCK_TAGS):
+        text = re.sub(r"\s+", " ", el.get_text(" ", strip=True))
+        if not text:
+            continue
+        if el.name.startswith("h"):
+            text = "#" * int(el.name[1]) + " " + text
+        blocks.append(text)
+    return "\n\n".join(blocks)
+
+
+def quality_issue(text: str) -> Optional[str]:
+    """Why `text` is not a usable article body, or None if it is."""
+    if len(text) < MIN_TEXT_CHARS:
+        return "too-short"
+    low = text.lower()
+    if any(m in low for m in PAYWALL_MARKERS):
+        return "paywall"
+    if any(m in low for m in JS_SHELL_MARKERS):
+        return "js-shell"
+    return None
+
+
+@dataclass
+class _DomainTier:
+    http_failures: int = 0
+    since_probe: int = 0
+
+    @property
+    def prefers_browser(self) -> bool:
+        return self.http_failures >= HTTP_FAIL_LIMIT
+
+
+class ArticleFetcher:
+    """HTTP first, browser only when the HTTP text fails the quality check."""
+
+    def __init__(self):
+        self._domains: Dict[str, _DomainTier] = {}
+        self.stats = {"http": 0, "browser": 0, "http_rejected": 0, "cache": 0, "session_refreshes": 0}
+
+    def tier_for(self, url: str) -> str:
+        return BROWSER if self._domains.get(domain_of(url), _DomainTier()).prefers_browser else HTTP
+
+    def _should_try_http(self, tier: _DomainTier) -> bool:
+        if not tier.prefers_browser:
+            return True
+        tier.since_probe += 1
+        if tier.since_probe >= HTTP_REPROBE_EVERY:
+            tier.since_probe = 0
+            return True
+        return False
+
+    async def fetch(self, url: str, readiness: Optional[PageReadiness] = None) -> str:
+        cached = await self._from_cache(url)
+        if cached is not None:
+            self.stats["cache"] += 1
+            return cached
+
+        tier = self._domains.setdefault(domain_of(url), _DomainTier())
+        # Logged-in cookies for domains with an account, [] otherwise.
+        cookies = await session_manager.cookies_for(url)
+
+        if self._should_try_http(tier):
+            text, issue = await self._fetch_http(url, cookies)
+            if issue == "paywall" and await self._refresh_session(url):
+                cookies = await session_manager.cookies_for(url)
+                text, issue = await self._fetch_http(url, cookies)
+            if issue is None:
+                tier.http_failures = 0
+                self.stats["http"] += 1
+                return text
+            tier.http_failures += 1
+            self.stats["http_rejected"] += 1
+            print(f"ArticleFetcher: HTTP tier rejected for {url} ({issue}), using browser")
+
+        self.stats["browser"] += 1
+        readiness = readiness or ARTICLE_READINESS
+        text = await self._fetch_browser(url, readiness, cookies)
+        # Blocked or empty pages come back without markdown; only real text can be a paywall.
+        if text and quality_issue(text) == "paywall" and await self._refresh_session(url):
+            text = await self._fetch_browser(url, readiness, await session_manager.cookies_for(url))
+        return text
+
+    async def _refresh_session(self, url: str) -> bool:
+        if not await session_manager.refresh(url):
+            return False
+        self.stats["session_refreshes"] += 1
+        print(f"ArticleFetcher: paywall on {url}, retrying with a fresh session")
+        return True
+
+    async def _from_cache(self, url: str) -> Optional[str]:
+        markdown = await asyncio.to_thread(page_cache.get, url, MARKDOWN)
+        if markdown:
+            return markdown
+        html = await asyncio.to_thread(page_cache.get, url, HTML)
+        if html:
+            text = await asyncio.to_thread(html_to_text, html)
+            if quality_issue(text) is None:
+                return text
+        return None
+
+    async def _fetch_http(self, url: str, cookies=None):
+        cookie = cookie_header(cookies, url) if cookies else ""
+        headers = {"Cookie": cookie} if cookie else None
+        try:
+            resp = await get_http_client().get(url, headers=headers)
+            if resp.status_code >= 400:
+                return "", f"http-{resp.status_code}"
+            if "html" not in resp.headers.get("content-type", "html"):
+                return "", "not-html"
+            html = resp.text
+            await asyncio.to_thread(page_cache.put, url, HTML, html)
+            text = await asyncio.to_thread(html_to_text, html)
+        except Exception as e:
+            return "", f"error: {e}"
+        return text, quality_issue(text)
+
+    async def _fetch_browser(self, url: str, readiness: PageReadiness, cookies=None) -> str:
+        run_cfg = readiness.run_config(exclude_external_links=True)
+        result = await browser_pool.crawl(url, run_cfg, cookies=cookies)
+        if result.success and result.markdown and quality_issue(result.markdown) != "paywall":
+            await asyncio.to_thread(page_cache.put, url, MARKDOWN, result.markdown)
+            await asyncio.to_thread(page_cache.put, url, HTML, result.html)
+        return result.markdown
+
+
+article_fetcher = ArticleFetcher()
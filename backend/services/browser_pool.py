@@ -0,0 +1,411 @@
+# services/browser_pool.py
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from itertools import count
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
+
+COOKIES_FILE = "cookies.json"
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0 Safari/537.36"
+)
+
+# Number of tabs (crawl4ai sessions) served concurrently by the shared browser.
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "4"))
+# A tab is closed and reopened after this many navigations (leaks, stale JS state).
+BROWSER_POOL_PAGES_PER_TAB = int(os.getenv("BROWSER_POOL_PAGES_PER_TAB", "25"))
+# The whole browser process is restarted after this many navigations.
+BROWSER_POOL_PAGES_PER_BROWSER = int(os.getenv("BROWSER_POOL_PAGES_PER_BROWSER", "500"))
+# Consecutive failed navigations (with a failed health probe) before a restart.
+BROWSER_POOL_MAX_FAILURES = int(os.getenv("BROWSER_POOL_MAX_FAILURES", "3"))
+
+# Abort image/media/font requests and known trackers in every browser context.
+BROWSER_BLOCK_RESOURCES = os.getenv("BROWSER_BLOCK_RESOURCES", "1") == "1"
+
+HEALTH_PROBE_URL = "raw:<html><body>ok</body></html>"
+
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+TRACKER_DOMAINS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "google-analytics.com",
+    "adservice.google.com",
+    "amazon-adsystem.com",
+    "adsrvr.org",
+    "scorecardresearch.com",
+    "chartbeat.com",
+    "chartbeat.net",
+    "taboola.com",
+    "outbrain.com",
+    "hotjar.com",
+    "connect.facebook.net",
+    "bat.bing.com",
+    "permutive.com",
+    "krxd.net",
+    "quantserve.com",
+    "segment.io",
+)
+CONSENT_SELECTORS = (
+    "#onetrust-accept-btn-handler",
+    'button[name="agree"]',
+    'button:has-text("Alle akzeptieren")',
+    'button:has-text("Accept all")',
+)
+
+
+def load_cookies():
+    try:
+        with open(COOKIES_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print("No cookies.json found, running without cookies")
+        return None
+
+
+def _is_tracker(url: str) -> bool:
+    host = urlparse(url).netloc.lower()
+    return any(host == d or host.endswith("." + d) for d in TRACKER_DOMAINS)
+
+
+def _cookie_covers(cookie: dict, url: str) -> bool:
+    host = urlparse(url).netloc.lower()
+    if cookie.get("url"):
+        return urlparse(cookie["url"]).netloc.lower() == host
+    domain = (cookie.get("domain") or "").lstrip(".").lower()
+    return bool(domain) and (host == domain or host.endswith("." + domain))
+
+
+@dataclass(frozen=True)
+class PageReadiness:
+    """
+    When a rendered page is ready to be read, replacing fixed WAIT sleeps.
+
+    ready_selector: CSS selector polled after navigation until it matches at least
+                    `min_matches` elements; the poll ends early on a match and otherwise
+                    gives up after `timeout_ms`, and the crawl goes on either way.
+    network_idle_ms: without a selector, wait for network idle capped at this.
+    consent_wait_s: pause before the consent clicks so CMP banners have rendered.
+    baseline_wait_s: the fixed sleeps this replaces, used to report time saved.
+    """
+
+    ready_selector: Optional[str] = None
+    min_matches: int = 1
+    timeout_ms: int = 8000
+    network_idle_ms: int = 3000
+    consent_selectors: Tuple[str, ...] = CONSENT_SELECTORS
+    consent_wait_s: float = 1.0
+    baseline_wait_s: float = 0.0
+
+    def run_config(self, **kwargs) -> CrawlerRunConfig:
+        lines = [f"IF (EXISTS `{sel}`) THEN CLICK `{sel}`" for sel in self.consent_selectors]
+        if lines and self.consent_wait_s:
+            lines.insert(0, f"WAIT {self.consent_wait_s:g}")
+        return CrawlerRunConfig(
+            c4a_script="\n".join(lines) or None,
+            shared_data={
+                "ready_selector": self.ready_selector,
+                "min_matches": self.min_matches,
+                "ready_timeout_ms": self.timeout_ms,
+                "network_idle_ms": 0 if self.ready_selector else self.network_idle_ms,
+                "baseline_wait_s": self.baseline_wait_s,
+            },
+            **kwargs,
+        )
+
+
+@dataclass
+class _Tab:
+    session_id: str
+    pages: int = 0
+
+
+class BrowserPool:
+    """
+    One long-lived headless browser shared by all scraper nodes.
+
+    The browser lives on its own event loop in a daemon thread, so it can be
+    borrowed from the Quart loop, from graph nodes and from ad-hoc
+    `asyncio.run` scripts alike. Each borrow gets an exclusive tab.
+    """
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        pages_per_tab: int = BROWSER_POOL_PAGES_PER_TAB,
+        pages_per_browser: int = BROWSER_POOL_PAGES_PER_BROWSER,
+        max_failures: int = BROWSER_POOL_MAX_FAILURES,
+    ):
+        self.size = size
+        self.pages_per_tab = pages_per_tab
+        self.pages_per_browser = pages_per_browser
+        self.max_failures = max_failures
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_lock = threading.Lock()
+        self._ids = count()
+
+        # Everything below is only touched from the pool loop.
+        self._cond: Optional[asyncio.Condition] = None
+        self._crawler: Optional[AsyncWebCrawler] = None
+        self._idle: list[_Tab] = []
+        self._busy = 0
+        self._pages = 0
+        self._failures = 0
+        self._recycle_pending = False
+        self._goto_at: Dict[str, float] = {}
+        self._cookies: Dict[str, list] = {}
+        # session_id -> (context, cookies) added for the current crawl, cleared after it.
+        self._added_cookies: Dict[str, Tuple[object, list]] = {}
+        self.stats = {
+            "pages": 0,
+            "failures": 0,
+            "tab_recycles": 0,
+            "browser_starts": 0,
+            "blocked_requests": 0,
+            "ready_pages": 0,
+            "time_saved_s": 0.0,
+        }
+
+    # ---------- Public API (any loop / thread) ----------
+    async def crawl(
+        self, url: str, config: Optional[CrawlerRunConfig] = None, cookies: Optional[list] = None
+    ):
+        """`cookies` (Playwright format) are added to the tab's context before navigating."""
+        fut = asyncio.run_coroutine_threadsafe(self._crawl(url, config, cookies), self._ensure_loop())
+        return await asyncio.wrap_future(fut)
+
+    def crawl_sync(
+        self, url: str, config: Optional[CrawlerRunConfig] = None, cookies: Optional[list] = None
+    ):
+        fut = asyncio.run_coroutine_threadsafe(self._crawl(url, config, cookies), self._ensure_loop())
+        return fut.result()
+
+    async def close(self) -> None:
+        if self._loop is None:
+            return
+        fut = asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        await asyncio.wrap_future(fut)
+
+    def health(self) -> dict:
+        return {
+            "running": self._crawler is not None,
+            "idle_tabs": len(self._idle),
+            "busy_tabs": self._busy,
+            "pages_since_start": self._pages,
+            "consecutive_failures": self._failures,
+            **self.stats,
+        }
+
+    # ---------- Pool loop ----------
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._thread_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="browser-pool", daemon=True
+                ).start()
+                self._loop = loop
+            return self._loop
+
+    def _new_tab(self) -> _Tab:
+        return _Tab(session_id=f"pool-tab-{next(self._ids)}")
+
+    async def _start(self) -> None:
+        browser_cfg = BrowserConfig(
+            headless=True,
+            user_agent=USER_AGENT,
+            cookies=load_cookies(),
+            viewport_width=1920,
+            viewport_height=1080,
+        )
+        crawler = AsyncWebCrawler(config=browser_cfg)
+        crawler.crawler_strategy.set_hook("on_page_context_created", self._on_context)
+        crawler.crawler_strategy.set_hook("before_goto", self._before_goto)
+        crawler.crawler_strategy.set_hook("after_goto", self._after_goto)
+        await crawler.start()
+        self._crawler = crawler
+        self._idle = [self._new_tab() for _ in range(self.size)]
+        self._pages = 0
+        self._failures = 0
+        self._recycle_pending = False
+        self.stats["browser_starts"] += 1
+
+    async def _stop(self) -> None:
+        crawler, self._crawler = self._crawler, None
+        self._idle = []
+        if crawler is not None:
+            try:
+                await crawler.close()
+            except Exception as e:
+                print(f"Browser pool: error while closing browser: {e}")
+
+    async def _shutdown(self) -> None:
+        if self._cond is None:
+            return
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._busy == 0)
+            await self._stop()
+
+    async def _acquire(self) -> _Tab:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        async with self._cond:
+            while True:
+                if self._busy == 0 and (self._crawler is None or self._recycle_pending):
+                    await self._stop()
+                    await self._start()
+                if self._idle and not self._recycle_pending:
+                    self._busy += 1
+                    return self._idle.pop()
+                await self._cond.wait()
+
+    async def _release(self, tab: _Tab, ok: bool) -> None:
+        # Probe before taking the lock: the tab still counts as busy, so the browser
+        # cannot be restarted under it, and other acquisitions are not held up.
+        healthy = ok or await self._probe()
+        async with self._cond:
+            self._busy -= 1
+            self._pages += 1
+            tab.pages += 1
+            self.stats["pages"] += 1
+            if ok:
+                self._failures = 0
+            else:
+                self.stats["failures"] += 1
+                if not healthy:
+                    self._failures += 1
+            if self._failures >= self.max_failures or self._pages >= self.pages_per_browser:
+                self._recycle_pending = True
+
+            if not ok or tab.pages >= self.pages_per_tab:
+                await self._kill_tab(tab)
+                tab = self._new_tab()
+                self.stats["tab_recycles"] += 1
+            if self._crawler is not None:
+                self._idle.append(tab)
+            self._cond.notify_all()
+
+    async def _kill_tab(self, tab: _Tab) -> None:
+        if self._crawler is None:
+            return
+        try:
+            await self._crawler.crawler_strategy.kill_session(tab.session_id)
+        except Exception as e:
+            print(f"Browser pool: could not close tab {tab.session_id}: {e}")
+
+    async def _probe(self) -> bool:
+        if self._crawler is None:
+            return False
+        try:
+            result = await self._crawler.arun(url=HEALTH_PROBE_URL, config=CrawlerRunConfig())
+            return bool(result.success)
+        except Exception:
+            return False
+
+    # ---------- crawl4ai hooks ----------
+    async def _on_context(self, page, context=None, config=None, **kwargs):
+        # Called for every crawl; the route is installed once per context.
+        if not BROWSER_BLOCK_RESOURCES or context is None or getattr(context, "_pool_routed", False):
+            return page
+        context._pool_routed = True
+
+        async def block(route):
+            req = route.request
+            if req.resource_type in BLOCKED_RESOURCE_TYPES or _is_tracker(req.url):
+                self.stats["blocked_requests"] += 1
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await context.route("**/*", block)
+        return page
+
+    async def _before_goto(self, page, context=None, url=None, config=None, **kwargs):
+        session_id = getattr(config, "session_id", None)
+        cookies = self._cookies.pop(session_id, None)
+        # Tabs share the browser context: only the target site's cookies go in, and
+        # _clear_cookies takes them out again once the crawl is done.
+        cookies = [c for c in cookies or [] if _cookie_covers(c, url or "")]
+        if cookies and context is not None:
+            try:
+                await context.add_cookies(cookies)
+                self._added_cookies[session_id] = (context, cookies)
+            except Exception as e:
+                print(f"Browser pool: could not set session cookies for {url}: {e}")
+        return page
+
+    async def _clear_cookies(self, session_id: str) -> None:
+        context, cookies = self._added_cookies.pop(session_id, (None, []))
+        for c in cookies:
+            try:
+                await context.clear_cookies(name=c["name"], domain=c.get("domain"))
+            except Exception as e:
+                print(f"Browser pool: could not clear session cookie {c['name']}: {e}")
+                return
+
+    async def _after_goto(self, page, context=None, url=None, response=None, config=None, **kwargs):
+        shared = getattr(config, "shared_data", None) or {}
+        if getattr(config, "session_id", None):
+            self._goto_at[config.session_id] = time.monotonic()
+        selector = shared.get("ready_selector")
+        idle_ms = shared.get("network_idle_ms")
+        if selector:
+            # Not crawl4ai's wait_for: a page that never matches must still be returned.
+            try:
+                await page.wait_for_function(
+                    "([sel, n]) => document.querySelectorAll(sel).length >= n",
+                    arg=[selector, shared.get("min_matches", 1)],
+                    timeout=shared.get("ready_timeout_ms", 8000),
+                )
+            except Exception:
+                pass  # capped: read whatever has rendered by now
+        elif idle_ms:
+            try:
+                await page.wait_for_load_state("networkidle", timeout=idle_ms)
+            except Exception:
+                pass  # capped: long-polling pages never go idle
+        return page
+
+    def _report_ready(self, tab: _Tab, url: str, config: CrawlerRunConfig) -> None:
+        goto_at = self._goto_at.pop(tab.session_id, None)
+        baseline = (config.shared_data or {}).get("baseline_wait_s")
+        if goto_at is None or not baseline:
+            return
+        ready_s = time.monotonic() - goto_at
+        saved = baseline - ready_s
+        self.stats["ready_pages"] += 1
+        self.stats["time_saved_s"] += saved
+        print(f"Browser pool: {url} ready in {ready_s:.1f}s ({saved:+.1f}s vs {baseline:.0f}s fixed wait)")
+
+    async def _crawl(self, url: str, config: Optional[CrawlerRunConfig], cookies: Optional[list] = None):
+        tab = await self._acquire()
+        ok = False
+        try:
+            run_cfg = (config or CrawlerRunConfig()).clone(session_id=tab.session_id)
+            if cookies:
+                self._cookies[tab.session_id] = cookies
+            result = await self._crawler.arun(url=url, config=run_cfg)
+            ok = bool(result.success)
+            if ok:
+                self._report_ready(tab, url, run_cfg)
+            return result
+        finally:
+            self._goto_at.pop(tab.session_id, None)
+            self._cookies.pop(tab.session_id, None)
+            await self._clear_cookies(tab.session_id)
+            await self._release(tab, ok)
+
+
+browser_pool = BrowserPool()
@@ -1,5 +1,10 @@
+import os
+
 from simhash import Simhash
 
+# Window for near-duplicate and semantic-duplicate checks.
+LOOKBACK_DAYS = int(os.getenv("DEDUP_LOOKBACK_DAYS", "7"))
+
 
 def simhash64(text: str) -> int:
     return Simhash(text or "").value
@@ -1,8 +1,187 @@
-from typing import List
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
 from langchain_openai import OpenAIEmbeddings
 
-_embedding = OpenAIEmbeddings(model="text-embedding-3-small")
+EMBEDDING_MODEL = "text-embedding-3-small"
+# In-memory LRU entries (one 1536-float vector each, ~6 KB).
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "4096"))
+# SQLite file for the persistent cache; empty disables it.
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", ".cache/embeddings.sqlite")
+# Concurrent requests arriving within this window share one embed_documents call.
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "20"))
+EMBED_BATCH_MAX = int(os.getenv("EMBED_BATCH_MAX", "64"))
+
+_embedding = OpenAIEmbeddings(model=EMBEDDING_MODEL)
+
+stats = {"memory_hits": 0, "disk_hits": 0, "embedded": 0, "api_calls": 0}
+
+
+def _key(text: str) -> str:
+    return hashlib.sha256(f"{EMBEDDING_MODEL}\0{text}".encode("utf-8")).hexdigest()
+
+
+class _EmbeddingStore:
+    """LRU in front of an optional SQLite table, keyed by sha256(model, text)."""
+
+    def __init__(self, size: int = EMBED_CACHE_SIZE, path: str = EMBED_CACHE_PATH):
+        self.size = size
+        self.path = Path(path) if path else None
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _conn(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB)")
+        return self._db
+
+    def get_memory(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vec = self._lru.get(key)
+            if vec is not None:
+                self._lru.move_to_end(key)
+            return vec
+
+    def _remember(self, key: str, vec: np.ndarray) -> None:
+        self._lru[key] = vec
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.size:
+            self._lru.popitem(last=False)
+
+    def get_disk(self, key: str) -> Optional[np.ndarray]:
+        """Blocking."""
+        with self._lock:
+            db = self._conn()
+            if db is None:
+                return None
+            row = db.execute("SELECT vec FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            vec = np.frombuffer(row[0], dtype=np.float32)
+            self._remember(key, vec)
+            return vec
+
+    def put(self, items: List[Tuple[str, np.ndarray]]) -> None:
+        """Blocking."""
+        with self._lock:
+            for key, vec in items:
+                self._remember(key, vec)
+            db = self._conn()
+            if db is not None:
+                db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)",
+                    [(key, vec.tobytes()) for key, vec in items],
+                )
+                db.commit()
+
+
+class _Batcher:
+    """Coalesces concurrent misses (and identical texts) into one embed_documents call."""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _bind(self) -> None:
+        # Futures belong to one event loop; scripts using asyncio.run start clean.
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._pending, self._inflight, self._timer = {}, {}, None
+
+    def submit(self, key: str, text: str) -> asyncio.Future:
+        self._bind()
+        if key in self._pending:
+            return self._pending[key][1]
+        if key in self._inflight:
+            return self._inflight[key]
+        fut = self._loop.create_future()
+        self._pending[key] = (text, fut)
+        if len(self._pending) >= EMBED_BATCH_MAX:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = self._loop.call_later(EMBED_BATCH_WINDOW_MS / 1000, self._dispatch)
+        return fut
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        for key, (_, fut) in batch.items():
+            self._inflight[key] = fut
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[str, Tuple[str, asyncio.Future]]) -> None:
+        keys = list(batch)
+        try:
+            stats["api_calls"] += 1
+            vectors = await _embedding.aembed_documents([batch[k][0] for k in keys])
+            arrays = [np.asarray(v, dtype=np.float32) for v in vectors]
+            stats["embedded"] += len(arrays)
+            await asyncio.to_thread(_store.put, list(zip(keys, arrays)))
+            for key, vec in zip(keys, arrays):
+                if not batch[key][1].done():
+                    batch[key][1].set_result(vec)
+        except Exception as e:
+            for _, fut in batch.values():
+                if not fut.done():
+                    fut.set_exception(e)
+        finally:
+            for key in keys:
+                self._inflight.pop(key, None)
+
+
+_store = _EmbeddingStore()
+_batcher = _Batcher()
 
 
 def embed_text(text: str) -> List[float]:
-    return _embedding.embed_query(text)
+    key = _key(text)
+    vec = _store.get_memory(key)
+    if vec is None:
+        vec = _store.get_disk(key)
+    if vec is None:
+        stats["api_calls"] += 1
+        stats["embedded"] += 1
+        vec = np.asarray(_embedding.embed_query(text), dtype=np.float32)
+        _store.put([(key, vec)])
+    return vec.tolist()
+
+
+async def aembed_text(text: str) -> List[float]:
+    """Each distinct text is embedded once: LRU, then SQLite, then a batched API call."""
+    key = _key(text)
+    vec = _store.get_memory(key)
+    if vec is not None:
+        stats["memory_hits"] += 1
+        return vec.tolist()
+    vec = await asyncio.to_thread(_store.get_disk, key)
+    if vec is not None:
+        stats["disk_hits"] += 1
+        return vec.tolist()
+    # The future is shared by every caller with this text: one caller being cancelled
+    # must not cancel it for the others.
+    vec = await asyncio.shield(_batcher.submit(key, text))
+    return vec.tolist()
@@ -0,0 +1,92 @@
+# services/feed_cache.py
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import feedparser
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+
+USER_AGENT = "Mozilla/5.0"
+OG_IMAGE_CACHE_SIZE = int(os.getenv("OG_IMAGE_CACHE_SIZE", "4096"))
+OG_IMAGE_TIMEOUT_S = float(os.getenv("OG_IMAGE_TIMEOUT_S", "10"))
+
+
+@dataclass
+class _FeedState:
+    etag: Optional[str] = None
+    modified: Optional[str] = None
+    guids: Tuple[str, ...] = field(default_factory=tuple)
+
+
+def _guid(entry) -> str:
+    return entry.get("id") or entry.get("guid") or entry.get("link") or ""
+
+
+class FeedCache:
+    """
+    Conditional-GET wrapper around feedparser.
+
+    `fetch` returns None when the feed is unchanged since the last call (HTTP 304
+    or the same item GUIDs), otherwise the parsed entries. Blocking; call it
+    from a worker thread.
+    """
+
+    def __init__(self, og_cache_size: int = OG_IMAGE_CACHE_SIZE):
+        self._feeds: Dict[str, _FeedState] = {}
+        self._og: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._og_cache_size = og_cache_size
+        self._lock = threading.Lock()
+        self._http = requests.Session()
+        self._http.headers["User-Agent"] = USER_AGENT
+        self.stats = {"fetched": 0, "not_modified": 0, "unchanged": 0, "og_hits": 0, "og_misses": 0}
+
+    def fetch(self, url: str) -> Optional[List]:
+        state = self._feeds.get(url) or _FeedState()
+        feed = feedparser.parse(
+            url, etag=state.etag, modified=state.modified, agent=USER_AGENT
+        )
+        if getattr(feed, "status", None) == 304:
+            self.stats["not_modified"] += 1
+            return None
+
+        guids = tuple(_guid(e) for e in feed.entries)
+        unchanged = bool(guids) and guids == state.guids
+        if feed.entries:
+            # Keep the old validators if a broken response came back without entries.
+            self._feeds[url] = _FeedState(
+                etag=feed.get("etag"), modified=feed.get("modified"), guids=guids
+            )
+        if unchanged:
+            self.stats["unchanged"] += 1
+            return None
+        self.stats["fetched"] += 1
+        return feed.entries
+
+    def og_image(self, url: str) -> Optional[str]:
+        with self._lock:
+            if url in self._og:
+                self._og.move_to_end(url)
+                self.stats["og_hits"] += 1
+                return self._og[url]
+        self.stats["og_misses"] += 1
+
+        # Network errors are not cached so the next cycle can retry.
+        resp = self._http.get(url, timeout=OG_IMAGE_TIMEOUT_S)
+        resp.raise_for_status()
+        soup = BeautifulSoup(resp.text, "html.parser", parse_only=SoupStrainer("meta"))
+        og_img = soup.find("meta", property="og:image")
+        image_url = og_img["content"] if og_img else None
+
+        with self._lock:
+            self._og[url] = image_url
+            while len(self._og) > self._og_cache_size:
+                self._og.popitem(last=False)
+        return image_url
+
+
+feed_cache = FeedCache()
@@ -0,0 +1,58 @@
+# services/fetch_limiter.py
+from __future__ import annotations
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Page fetches in flight across all sources (keep <= BROWSER_POOL_SIZE for browser fetches).
+FETCH_MAX_CONCURRENCY = int(os.getenv("FETCH_MAX_CONCURRENCY", "4"))
+# Page fetches in flight against a single domain.
+FETCH_MAX_PER_DOMAIN = int(os.getenv("FETCH_MAX_PER_DOMAIN", "2"))
+# Hard cap on a single page fetch, in seconds.
+FETCH_TIMEOUT_S = float(os.getenv("FETCH_TIMEOUT_S", "45"))
+
+
+def domain_of(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class FetchLimiter:
+    """Global + per-domain concurrency limits for page fetches."""
+
+    def __init__(
+        self,
+        max_concurrency: int = FETCH_MAX_CONCURRENCY,
+        max_per_domain: int = FETCH_MAX_PER_DOMAIN,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_per_domain = max_per_domain
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._global: Optional[asyncio.Semaphore] = None
+        self._domains: Dict[str, asyncio.Semaphore] = {}
+
+    def _bind(self) -> None:
+        # Semaphores belong to one event loop; scripts using asyncio.run get fresh ones.
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._global = asyncio.Semaphore(self.max_concurrency)
+            self._domains = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str, per_domain: Optional[int] = None):
+        self._bind()
+        domain = domain_of(url)
+        sem = self._domains.get(domain)
+        if sem is None:
+            sem = self._domains[domain] = asyncio.Semaphore(per_domain or self.max_per_domain)
+        # Take the domain slot first so waiting on a busy domain does not hold a global slot.
+        async with sem:
+            async with self._global:
+                yield
+
+
+fetch_limiter = FetchLimiter()
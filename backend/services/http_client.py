@@ -0,0 +1,46 @@
+# services/http_client.py
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Optional
+
+import httpx
+
+from backend.services.browser_pool import USER_AGENT
+
+HTTP_TIMEOUT_S = float(os.getenv("HTTP_TIMEOUT_S", "15"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared keep-alive HTTP/2 client (gzip/brotli negotiated by httpx) for the running loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            timeout=HTTP_TIMEOUT_S,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+            ),
+            headers={
+                "User-Agent": USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml",
+                "Accept-Language": "en-US,en;q=0.9",
+            },
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client, _client_loop = None, None
@@ -0,0 +1,148 @@
+# services/llm.py
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+from typing import Any, Optional
+
+import openai
+from langchain_openai import ChatOpenAI
+
+from backend.services.llm_cache import CacheSpec, llm_cache
+
+# LLM requests in flight across the whole process.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# Account quotas; the buckets refill continuously at quota/60 per second.
+LLM_RPM = int(os.getenv("LLM_RPM", "500"))
+LLM_TPM = int(os.getenv("LLM_TPM", "450000"))
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "90"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE_S = 1.0
+LLM_BACKOFF_MAX_S = 30.0
+# Completion tokens assumed per call when reserving TPM budget.
+LLM_OUTPUT_TOKENS = int(os.getenv("LLM_OUTPUT_TOKENS", "800"))
+
+RETRYABLE = (
+    asyncio.TimeoutError,
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+def chat_model(model: str = "gpt-4o", **kwargs) -> ChatOpenAI:
+    """ChatOpenAI without its own retry loop; retries and timeouts live in `llm`."""
+    return ChatOpenAI(model=model, max_retries=0, **kwargs)
+
+
+def estimate_tokens(inputs: Any) -> int:
+    # ~4 characters per token for English prose; good enough for budgeting.
+    return len(str(inputs)) // 4 + LLM_OUTPUT_TOKENS
+
+
+class _TokenBucket:
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def take(self, n: float) -> float:
+        """Wait until `n` tokens are available and consume them; returns seconds waited."""
+        n = min(n, self.capacity)
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= n:
+                self.tokens -= n
+                return waited
+            delay = (n - self.tokens) / self.rate
+            waited += delay
+            await asyncio.sleep(delay)
+
+
+class LLMClient:
+    """
+    Shared async entry point for every LangChain LLM call in the pipelines.
+
+    Calls go through one concurrency limit and RPM/TPM token buckets, get a
+    per-call timeout, and are retried with full-jitter exponential backoff on
+    rate limits, timeouts, connection errors and 5xx responses.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        rpm: int = LLM_RPM,
+        tpm: int = LLM_TPM,
+    ):
+        self.max_concurrency = max_concurrency
+        self._rpm = _TokenBucket(rpm)
+        self._tpm = _TokenBucket(tpm)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self.stats = {"calls": 0, "retries": 0, "rate_limited": 0, "timeouts": 0, "throttled_s": 0.0}
+
+    def _bind(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; scripts using asyncio.run get a fresh one.
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        return self._sem
+
+    async def ainvoke(
+        self,
+        runnable,
+        inputs: Any,
+        *,
+        name: str = "llm",
+        tokens: Optional[int] = None,
+        timeout: float = LLM_TIMEOUT_S,
+        cache: Optional[CacheSpec] = None,
+        cache_input: Any = None,
+    ):
+        """
+        `cache` enables the persistent response cache for this call; the key is the
+        spec plus `cache_input` (defaults to `inputs`, pass the real text when the
+        prompt is pre-built and inputs is empty).
+        """
+        key = None
+        if cache is not None and llm_cache.enabled:
+            key = llm_cache.key(cache, inputs if cache_input is None else cache_input)
+            cached = await asyncio.to_thread(llm_cache.get, cache, key)
+            if cached is not None:
+                return cached
+
+        result = await self._call(runnable, inputs, name, tokens or estimate_tokens(inputs), timeout)
+        if key is not None and result is not None:
+            await asyncio.to_thread(llm_cache.put, cache, key, result)
+        return result
+
+    async def _call(self, runnable, inputs: Any, name: str, tokens: int, timeout: float):
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            try:
+                async with self._bind():
+                    self.stats["throttled_s"] += await self._rpm.take(1)
+                    self.stats["throttled_s"] += await self._tpm.take(tokens)
+                    self.stats["calls"] += 1
+                    return await asyncio.wait_for(runnable.ainvoke(inputs), timeout=timeout)
+            except RETRYABLE as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stats["timeouts"] += 1
+                if isinstance(e, openai.RateLimitError):
+                    self.stats["rate_limited"] += 1
+                if attempt == LLM_MAX_RETRIES:
+                    raise
+                self.stats["retries"] += 1
+                delay = random.uniform(0, min(LLM_BACKOFF_MAX_S, LLM_BACKOFF_BASE_S * 2 ** attempt))
+                print(f"LLM {name}: {type(e).__name__}, retry {attempt + 1}/{LLM_MAX_RETRIES} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+
+llm = LLMClient()
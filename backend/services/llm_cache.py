@@ -0,0 +1,122 @@
+# services/llm_cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# SQLite file holding cached LLM responses; empty disables the cache.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm.sqlite")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+# Size is checked every N writes; eviction drops the least recently used 10%.
+_EVICT_CHECK_EVERY = 200
+
+
+@dataclass(frozen=True)
+class CacheSpec:
+    """Everything besides the input that decides an LLM answer."""
+
+    stage: str
+    model: str
+    temperature: Optional[float]
+    prompt_version: str
+
+
+def cache_spec(stage: str, prompt: Any, model: Any) -> CacheSpec:
+    """`prompt` is a prompt template or its raw text; editing it changes prompt_version."""
+    text = prompt if isinstance(prompt, str) else prompt.pretty_repr()
+    return CacheSpec(
+        stage=stage,
+        model=getattr(model, "model_name", str(model)),
+        temperature=getattr(model, "temperature", None),
+        prompt_version=hashlib.sha256(text.encode("utf-8")).hexdigest()[:16],
+    )
+
+
+def _default(o: Any) -> Any:
+    if hasattr(o, "model_dump"):
+        return o.model_dump()
+    return str(o)
+
+
+class LLMResponseCache:
+    """
+    Persistent (model, prompt version, temperature, input hash) -> response store.
+    Responses are pickled (pydantic models, AIMessages). Blocking; call from a worker thread.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes = 0
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, stage TEXT, value BLOB, last_access REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_access ON responses (last_access)")
+        return self._db
+
+    @staticmethod
+    def key(spec: CacheSpec, inputs: Any) -> str:
+        payload = json.dumps([asdict(spec), inputs], sort_keys=True, default=_default)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, stage: str, what: str) -> None:
+        self.stats.setdefault(stage, {"hits": 0, "misses": 0})[what] += 1
+
+    def get(self, spec: CacheSpec, key: str) -> Optional[Any]:
+        with self._lock:
+            db = self._conn()
+            row = db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count(spec.stage, "misses")
+                return None
+            db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            db.commit()
+            self._count(spec.stage, "hits")
+            return pickle.loads(row[0])
+
+    def put(self, spec: CacheSpec, key: str, value: Any) -> None:
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, stage, value, last_access) VALUES (?, ?, ?, ?)",
+                (key, spec.stage, pickle.dumps(value), time.time()),
+            )
+            self._writes += 1
+            if self._writes % _EVICT_CHECK_EVERY == 0:
+                self._evict(db)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        (n,) = db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if n <= self.max_entries:
+            return
+        drop = n - int(self.max_entries * 0.9)
+        db.execute(
+            "DELETE FROM responses WHERE key IN "
+            "(SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+            (drop,),
+        )
+
+
+llm_cache = LLMResponseCache()
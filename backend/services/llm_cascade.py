@@ -0,0 +1,125 @@
+# services/llm_cascade.py
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.exceptions import OutputParserException
+from pydantic import ValidationError
+
+from backend.services.llm import chat_model, llm
+from backend.services.llm_cache import cache_spec
+
+# Default tiers for a cascaded stage, cheapest first ("a>b>c").
+LLM_CASCADE_DEFAULT = os.getenv("LLM_CASCADE_DEFAULT", "gpt-4o-mini>gpt-4o")
+# A cheap answer reporting less confidence than this is redone on the next tier.
+LLM_ESCALATE_CONFIDENCE = float(os.getenv("LLM_ESCALATE_CONFIDENCE", "0.6"))
+# Articles whose (pre-)impact score reaches this go straight to the largest tier.
+LLM_ESCALATE_IMPACT = float(os.getenv("LLM_ESCALATE_IMPACT", "70"))
+
+INVALID_OUTPUT = (OutputParserException, ValidationError, ValueError)
+
+# Per stage: {"calls", "first_tier", "escalated", "direct", "reasons": {reason: n}}.
+stats: Dict[str, Dict[str, Any]] = {}
+
+
+def _tiers(stage: str, default: str) -> List[str]:
+    # LLM_CASCADE_<STAGE>="gpt-4o" pins a stage to one model; "a>b" cascades.
+    spec = os.getenv(f"LLM_CASCADE_{stage.upper()}", default)
+    return [m.strip() for m in spec.split(">") if m.strip()]
+
+
+class ModelCascade:
+    """
+    Cheap-first model policy for one pipeline stage.
+
+    `ainvoke` runs the structured chain on the first tier and moves up a tier when
+    the output fails validation or `check` returns a reason (e.g. low confidence).
+    `start_large` skips straight to the last tier for high-impact articles. Every
+    escalation is logged and counted in `stats[stage]`.
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        prompt=None,
+        schema=None,
+        *,
+        temperature: Optional[float] = None,
+        default: str = LLM_CASCADE_DEFAULT,
+    ):
+        self.stage = stage
+        kwargs = {} if temperature is None else {"temperature": temperature}
+        self.models = [chat_model(name, **kwargs) for name in _tiers(stage, default)]
+        self.min_confidence = float(
+            os.getenv(f"LLM_ESCALATE_CONFIDENCE_{stage.upper()}", str(LLM_ESCALATE_CONFIDENCE))
+        )
+        self.chains = []
+        self.caches = []
+        if prompt is not None and schema is not None:
+            self.chains = [
+                prompt | m.with_structured_output(schema, method="function_calling") for m in self.models
+            ]
+            self.caches = [cache_spec(stage, prompt, m) for m in self.models]
+        self.stats = stats.setdefault(
+            stage, {"calls": 0, "first_tier": 0, "escalated": 0, "direct": 0, "reasons": {}}
+        )
+
+    @property
+    def large(self):
+        return self.models[-1]
+
+    def model_for(self, attempt: int):
+        """Tier to use on the n-th (0-based) attempt of a caller-managed retry loop."""
+        return self.models[min(attempt, len(self.models) - 1)]
+
+    def low_confidence(self, confidence: Optional[float]) -> Optional[str]:
+        if confidence is not None and confidence < self.min_confidence:
+            return f"confidence {confidence:.2f} < {self.min_confidence:.2f}"
+        return None
+
+    def escalated(self, reason: str, frm: int = 0) -> None:
+        kind = reason.split(" ", 1)[0]
+        self.stats["escalated"] += 1
+        self.stats["reasons"][kind] = self.stats["reasons"].get(kind, 0) + 1
+        nxt = self.models[min(frm + 1, len(self.models) - 1)]
+        print(f"LLM cascade {self.stage}: {self.models[frm].model_name} -> {nxt.model_name} ({reason})")
+
+    async def ainvoke(
+        self,
+        inputs: Any,
+        *,
+        check: Optional[Callable[[Any], Optional[str]]] = None,
+        start_large: bool = False,
+        tokens: Optional[int] = None,
+        cache_input: Any = None,
+    ):
+        last = len(self.models) - 1
+        self.stats["calls"] += 1
+        tier = last if start_large else 0
+        if start_large and last > 0:
+            self.stats["direct"] += 1
+        while True:
+            try:
+                out = await llm.ainvoke(
+                    self.chains[tier],
+                    inputs,
+                    name=f"{self.stage}[{self.models[tier].model_name}]",
+                    tokens=tokens,
+                    cache=self.caches[tier],
+                    cache_input=cache_input,
+                )
+                if out is None:
+                    raise ValueError("no structured output")
+            except INVALID_OUTPUT as e:
+                if tier == last:
+                    raise
+                reason = f"invalid output: {type(e).__name__}"
+            else:
+                reason = None if tier == last or check is None else check(out)
+                if reason is None:
+                    if tier == 0 and last > 0:
+                        self.stats["first_tier"] += 1
+                    return out
+            self.escalated(reason, tier)
+            tier += 1
@@ -0,0 +1,219 @@
+# services/page_cache.py
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import zstandard
+
+from backend.services.url_index import canonicalize_url
+
+PAGE_CACHE_DIR = Path(os.getenv("PAGE_CACHE_DIR", ".cache/pages"))
+PAGE_CACHE_TTL_S = int(os.getenv("PAGE_CACHE_TTL_S", str(24 * 3600)))
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "1") == "1"
+# index.json is rewritten after this many writes or seconds, whichever comes first (and on exit).
+PAGE_CACHE_FLUSH_EVERY = int(os.getenv("PAGE_CACHE_FLUSH_EVERY", "100"))
+PAGE_CACHE_FLUSH_S = float(os.getenv("PAGE_CACHE_FLUSH_S", "30"))
+# Eviction starts above max_bytes and drops least recently used pages down to this share of it.
+PAGE_CACHE_LOW_WATER = 0.9
+
+HTML = "html"
+MARKDOWN = "markdown"
+
+
+class PageCache:
+    """
+    Content-addressed store for crawled pages.
+
+    index.json maps sha256(canonical url) -> {kind: {hash, size, stored_at}} plus
+    last access time; blobs live in objects/<hash[:2]>/<hash>.zst, keyed by the
+    sha256 of the uncompressed content so identical pages are stored once.
+    Blob sizes and reference counts are kept in memory, so a write is O(1) unless
+    the cache is over max_bytes; the index is flushed in batches (see flush()).
+    Blocking; call from a worker thread.
+    """
+
+    def __init__(
+        self,
+        root: Path = PAGE_CACHE_DIR,
+        ttl_s: int = PAGE_CACHE_TTL_S,
+        max_bytes: int = PAGE_CACHE_MAX_BYTES,
+    ):
+        self.root = Path(root)
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, dict]] = None
+        self._refs: Dict[str, list] = {}  # hash -> [size, refcount]
+        self._total = 0
+        self._dirty = 0
+        self._saved_at = time.monotonic()
+        self._cctx = zstandard.ZstdCompressor(level=6)
+        self._dctx = zstandard.ZstdDecompressor()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    # ---------- Index ----------
+    @property
+    def _index_path(self) -> Path:
+        return self.root / "index.json"
+
+    def _load(self) -> Dict[str, dict]:
+        if self._index is None:
+            try:
+                self._index = json.loads(self._index_path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._index = {}
+            for e in self._index.values():
+                for v in e["kinds"].values():
+                    self._ref(v["hash"], v["size"])
+        return self._index
+
+    def _ref(self, digest: str, size: int) -> None:
+        ref = self._refs.get(digest)
+        if ref is None:
+            self._refs[digest] = [size, 1]
+            self._total += size
+        else:
+            ref[1] += 1
+
+    def _unref(self, digest: str) -> None:
+        ref = self._refs.get(digest)
+        if ref is None:
+            return
+        ref[1] -= 1
+        if ref[1] <= 0:
+            del self._refs[digest]
+            self._total -= ref[0]
+            self._blob_path(digest).unlink(missing_ok=True)
+
+    def _save(self) -> None:
+        if self._index is None:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self._index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._index), encoding="utf-8")
+        os.replace(tmp, self._index_path)
+        self._dirty = 0
+        self._saved_at = time.monotonic()
+
+    def _maybe_save(self) -> None:
+        if self._dirty >= PAGE_CACHE_FLUSH_EVERY or (
+            self._dirty and time.monotonic() - self._saved_at >= PAGE_CACHE_FLUSH_S
+        ):
+            self._save()
+
+    def flush(self) -> None:
+        """Write pending index changes to disk."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.zst"
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(canonicalize_url(url).encode()).hexdigest()
+
+    # ---------- Public API ----------
+    def get(self, url: str, kind: str) -> Optional[str]:
+        if not PAGE_CACHE_ENABLED:
+            return None
+        with self._lock:
+            entry = self._load().get(self._key(url))
+            item = (entry or {}).get("kinds", {}).get(kind)
+            if not item or time.time() - item["stored_at"] > self.ttl_s:
+                self.stats["misses"] += 1
+                return None
+            try:
+                data = self._dctx.decompress(self._blob_path(item["hash"]).read_bytes())
+            except FileNotFoundError:
+                del entry["kinds"][kind]
+                self._unref(item["hash"])
+                self._dirty += 1
+                self.stats["misses"] += 1
+                return None
+            # Access times alone are not worth a flush; they go out with the next one.
+            entry["last_access"] = time.time()
+            self.stats["hits"] += 1
+            return data.decode("utf-8")
+
+    def put(self, url: str, kind: str, content: str) -> None:
+        if not PAGE_CACHE_ENABLED or not content:
+            return
+        raw = content.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        with self._lock:
+            index = self._load()
+            blob = self._blob_path(digest)
+            if digest in self._refs:
+                size = self._refs[digest][0]
+            else:
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                tmp = blob.with_suffix(".tmp")
+                tmp.write_bytes(self._cctx.compress(raw))
+                os.replace(tmp, blob)
+                size = blob.stat().st_size
+            now = time.time()
+            entry = index.setdefault(self._key(url), {"url": canonicalize_url(url), "kinds": {}})
+            previous = entry["kinds"].get(kind)
+            entry["kinds"][kind] = {"hash": digest, "size": size, "stored_at": now}
+            entry["last_access"] = now
+            self._ref(digest, size)
+            if previous:
+                self._unref(previous["hash"])
+            self.stats["writes"] += 1
+            self._dirty += 1
+            if self._total > self.max_bytes:
+                self._evict()
+            self._maybe_save()
+
+    def evict(self) -> None:
+        """Full pass: drop expired pages, then shrink to the low-water mark if needed."""
+        with self._lock:
+            self._evict(expire=True)
+            self._save()
+
+    def _drop(self, key: str, kinds) -> None:
+        entry = self._index[key]
+        for kind in kinds:
+            self._unref(entry["kinds"].pop(kind)["hash"])
+        if not entry["kinds"]:
+            del self._index[key]
+            self.stats["evictions"] += 1
+        self._dirty += 1
+
+    def _evict(self, expire: bool = False) -> None:
+        index = self._load()
+        if expire:
+            now = time.time()
+            for key in list(index):
+                expired = [k for k, v in index[key]["kinds"].items() if now - v["stored_at"] > self.ttl_s]
+                if expired:
+                    self._drop(key, expired)
+
+        if self._total > self.max_bytes:
+            # Expired pages go first, then least recently used.
+            now = time.time()
+            low_water = self.max_bytes * PAGE_CACHE_LOW_WATER
+
+            def order(k: str):
+                e = index[k]
+                stale = all(now - v["stored_at"] > self.ttl_s for v in e["kinds"].values())
+                return (not stale, e.get("last_access", 0))
+
+            for key in sorted(index, key=order):
+                self._drop(key, list(index[key]["kinds"]))
+                if self._total <= low_water:
+                    break
+
+
+page_cache = PageCache()
+atexit.register(page_cache.flush)
@@ -0,0 +1,263 @@
+# services/session_manager.py
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from cryptography.fernet import InvalidToken
+from playwright.async_api import async_playwright
+from sqlalchemy import text
+
+from backend.db.session import SessionLocal
+from backend.security.crypto import decrypt_secret, encrypt_secret
+from backend.services.browser_pool import USER_AGENT
+from backend.services.fetch_limiter import domain_of
+
+SESSION_DIR = Path(os.getenv("SESSION_DIR", ".cache/sessions"))
+# A cookie jar is re-created after this long even if its auth cookies have not expired.
+SESSION_MAX_AGE_S = int(os.getenv("SESSION_MAX_AGE_S", str(7 * 24 * 3600)))
+# Cookie names that carry the login (comma-separated); when none are present the
+# longest-lived cookies of the jar stand in for them.
+SESSION_AUTH_COOKIES = {
+    n.strip() for n in os.getenv("SESSION_AUTH_COOKIES", "").split(",") if n.strip()
+}
+# Minimum gap between two logins for the same domain (paywall false positives, bad passwords).
+SESSION_RELOGIN_COOLDOWN_S = int(os.getenv("SESSION_RELOGIN_COOLDOWN_S", "900"))
+# How long the accounts table is trusted before it is read again.
+ACCOUNTS_TTL_S = int(os.getenv("ACCOUNTS_TTL_S", "300"))
+LOGIN_TIMEOUT_MS = 20000
+
+
+@dataclass(frozen=True)
+class LoginRecipe:
+    login_url: Optional[str] = None  # defaults to the account's link
+    username_selector: str = "input[type='email'], input[name='email'], input[name='username'], input#username"
+    password_selector: str = "input[type='password']"
+    submit_selector: str = "button[type='submit'], input[type='submit']"
+
+
+# Per-domain overrides; any other domain uses the generic form above.
+LOGIN_RECIPES: Dict[str, LoginRecipe] = {
+    "ft.com": LoginRecipe(login_url="https://accounts.ft.com/login"),
+    "wsj.com": LoginRecipe(login_url="https://sso.accounts.dowjones.com/login-page"),
+    "bloomberg.com": LoginRecipe(login_url="https://www.bloomberg.com/account/signin"),
+}
+
+
+@dataclass
+class _Account:
+    id: str
+    domain: str
+    link: str
+    username: str
+    password_enc: str
+
+
+@dataclass
+class _Jar:
+    cookies: List[dict]
+    saved_at: float
+
+    def auth_cookies(self) -> List[dict]:
+        # Short-lived tracking / CSRF cookies come and go without ending the login, so
+        # only the named auth cookies count, or else the longest-lived persistent ones.
+        named = [c for c in self.cookies if c.get("name") in SESSION_AUTH_COOKIES]
+        if named:
+            return named
+        # Playwright uses -1 for session cookies.
+        persistent = [c for c in self.cookies if c.get("expires", -1) > 0]
+        if not persistent:
+            return []
+        longest = max(c["expires"] for c in persistent)
+        return [c for c in persistent if c["expires"] == longest]
+
+    def expired(self) -> bool:
+        now = time.time()
+        if now - self.saved_at > SESSION_MAX_AGE_S:
+            return True
+        return any(0 < c.get("expires", -1) < now for c in self.auth_cookies())
+
+
+def cookie_header(cookies: List[dict], url: str) -> str:
+    """Cookie request header with the jar entries whose domain covers `url`."""
+    host = urlparse(url).netloc.lower()
+    return "; ".join(
+        f"{c['name']}={c['value']}"
+        for c in cookies
+        if host == c.get("domain", "").lstrip(".") or host.endswith("." + c.get("domain", "").lstrip("."))
+    )
+
+
+class SessionManager:
+    """
+    Logged-in cookie jars for domains that have a row in `accounts`.
+
+    Each domain logs in once; the jar is kept in memory and persisted under
+    SESSION_DIR encrypted with the same Fernet key as account passwords.
+    A jar is replaced only when its auth cookies expire, it exceeds SESSION_MAX_AGE_S,
+    or the caller reports a paywall.
+    """
+
+    def __init__(self, root: Path = SESSION_DIR):
+        self.root = Path(root)
+        self._accounts: Dict[str, _Account] = {}
+        self._accounts_at = 0.0
+        self._jars: Dict[str, _Jar] = {}
+        self._last_login: Dict[str, float] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {"logins": 0, "login_failures": 0, "refreshes": 0, "disk_loads": 0}
+
+    # ---------- Public API ----------
+    async def cookies_for(self, url: str) -> List[dict]:
+        """Cookies to send to `url`, logging in first if needed; [] without an account."""
+        account = await self._account_for(url)
+        if account is None:
+            return []
+        jar = self._jars.get(account.domain)
+        if jar is not None and not jar.expired():
+            return jar.cookies
+        async with self._lock(account.domain):
+            jar = self._jars.get(account.domain) or await asyncio.to_thread(self._read, account.domain)
+            if (jar is None or jar.expired()) and self._may_login(account.domain):
+                jar = await self._login(account) or jar
+            if jar is None:
+                return []
+            self._jars[account.domain] = jar
+            return jar.cookies
+
+    async def refresh(self, url: str) -> bool:
+        """Called on a detected paywall. True if a fresh login produced new cookies."""
+        account = await self._account_for(url)
+        if account is None:
+            return False
+        async with self._lock(account.domain):
+            if not self._may_login(account.domain):
+                return False
+            self.stats["refreshes"] += 1
+            jar = await self._login(account)
+            if jar is None:
+                return False
+            self._jars[account.domain] = jar
+            return True
+
+    async def has_account(self, url: str) -> bool:
+        return await self._account_for(url) is not None
+
+    # ---------- Accounts ----------
+    async def _account_for(self, url: str) -> Optional[_Account]:
+        if time.time() - self._accounts_at > ACCOUNTS_TTL_S:
+            try:
+                await self._load_accounts()
+            except Exception as e:
+                print(f"SessionManager: could not load accounts: {e}")
+            self._accounts_at = time.time()
+        domain = domain_of(url)
+        for known, account in self._accounts.items():
+            if domain == known or domain.endswith("." + known):
+                return account
+        return None
+
+    async def _load_accounts(self) -> None:
+        async with SessionLocal() as session:
+            rows = (
+                await session.execute(
+                    text("SELECT id, link, username, password_enc FROM accounts")
+                )
+            ).mappings().all()
+        accounts = {}
+        for r in rows:
+            domain = domain_of(r["link"] if "//" in r["link"] else f"https://{r['link']}")
+            accounts[domain] = _Account(
+                id=str(r["id"]),
+                domain=domain,
+                link=r["link"],
+                username=r["username"],
+                password_enc=r["password_enc"],
+            )
+        # Jars of removed accounts are dropped with them.
+        for domain in set(self._jars) - set(accounts):
+            del self._jars[domain]
+        self._accounts = accounts
+
+    def _lock(self, domain: str) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._locks = {}
+        return self._locks.setdefault(domain, asyncio.Lock())
+
+    # ---------- Login ----------
+    def _may_login(self, domain: str) -> bool:
+        return time.time() - self._last_login.get(domain, 0.0) >= SESSION_RELOGIN_COOLDOWN_S
+
+    async def _login(self, account: _Account) -> Optional[_Jar]:
+        self._last_login[account.domain] = time.time()
+        recipe = LOGIN_RECIPES.get(account.domain, LoginRecipe())
+        try:
+            cookies = await self._browser_login(account, recipe)
+        except Exception as e:
+            self.stats["login_failures"] += 1
+            print(f"SessionManager: login to {account.domain} failed: {e}")
+            return None
+        self.stats["logins"] += 1
+        jar = _Jar(cookies=cookies, saved_at=time.time())
+        await asyncio.to_thread(self._write, account.domain, jar)
+        print(f"SessionManager: logged in to {account.domain} ({len(cookies)} cookies)")
+        return jar
+
+    async def _browser_login(self, account: _Account, recipe: LoginRecipe) -> List[dict]:
+        password = decrypt_secret(account.password_enc)
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                context = await browser.new_context(user_agent=USER_AGENT)
+                page = await context.new_page()
+                await page.goto(recipe.login_url or account.link, timeout=LOGIN_TIMEOUT_MS)
+                await page.fill(recipe.username_selector, account.username, timeout=LOGIN_TIMEOUT_MS)
+                # Two-step forms show the password field only after the username is submitted.
+                if not await page.is_visible(recipe.password_selector):
+                    await page.click(recipe.submit_selector)
+                    await page.wait_for_selector(recipe.password_selector, timeout=LOGIN_TIMEOUT_MS)
+                await page.fill(recipe.password_selector, password)
+                await page.click(recipe.submit_selector)
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=LOGIN_TIMEOUT_MS)
+                except Exception:
+                    pass
+                if await page.is_visible(recipe.password_selector):
+                    raise RuntimeError("still on the login form after submit")
+                return await context.cookies()
+            finally:
+                await browser.close()
+
+    # ---------- Persistence (blocking) ----------
+    def _path(self, domain: str) -> Path:
+        return self.root / f"{domain}.jar"
+
+    def _read(self, domain: str) -> Optional[_Jar]:
+        try:
+            data = json.loads(decrypt_secret(self._path(domain).read_text(encoding="utf-8")))
+        except (FileNotFoundError, InvalidToken, json.JSONDecodeError):
+            return None
+        self.stats["disk_loads"] += 1
+        return _Jar(cookies=data["cookies"], saved_at=data["saved_at"])
+
+    def _write(self, domain: str, jar: _Jar) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(domain)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(
+            encrypt_secret(json.dumps({"cookies": jar.cookies, "saved_at": jar.saved_at})),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+
+
+session_manager = SessionManager()
@@ -0,0 +1,119 @@
+# services/simhash_index.py
+from __future__ import annotations
+
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from backend.db.models import Article
+from backend.db.session import AsyncSessionLocal
+from backend.services.dedup import LOOKBACK_DAYS, hamming_distance
+from backend.utils.helpers import to_int, utcnow
+
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+
+class SimHashIndex:
+    """
+    In-memory index of 64-bit SimHashes from the last `lookback_days` days.
+
+    The hash is split into max_distance + 1 blocks, one lookup table per block:
+    two hashes within Hamming distance k differ in at most k blocks, so they
+    share at least one block exactly (pigeonhole). A lookup only popcounts the
+    few entries that collide on a block instead of scanning the window.
+    """
+
+    def __init__(self, max_distance: int = 3, lookback_days: float = LOOKBACK_DAYS):
+        self.max_distance = max_distance
+        self.ttl_s = lookback_days * 86400
+        n_blocks = max_distance + 1
+        # Block boundaries covering all 64 bits (16 bits each for k=3).
+        bounds = [64 * i // n_blocks for i in range(n_blocks + 1)]
+        self._blocks: List[Tuple[int, int]] = [
+            (lo, (1 << (hi - lo)) - 1) for lo, hi in zip(bounds, bounds[1:])
+        ]
+        self._tables: List[Dict[int, Set[str]]] = [{} for _ in self._blocks]
+        self._hashes: Dict[str, int] = {}
+        self._order: Deque[Tuple[float, str]] = deque()
+        self._warmed = False
+        self.stats = {"lookups": 0, "hits": 0, "candidates": 0}
+
+    async def warm(self) -> None:
+        cutoff = utcnow() - timedelta(seconds=self.ttl_s)
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(
+                select(Article.url, Article.hash_64, Article.fetched_at)
+                .where(Article.fetched_at >= cutoff, Article.hash_64.isnot(None))
+                .order_by(Article.fetched_at)
+            )
+            async for url, h, fetched_at in result:
+                self.add(url, to_int(h), fetched_at.timestamp())
+        self._warmed = True
+        print(f"SimHash index warmed with {len(self._hashes)} hashes")
+
+    async def ensure_warm(self) -> None:
+        if not self._warmed:
+            await self.warm()
+
+    @property
+    def warmed(self) -> bool:
+        return self._warmed
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def _keys(self, h: int) -> List[int]:
+        return [(h >> lo) & mask for lo, mask in self._blocks]
+
+    def add(self, url: str, h: Optional[int], seen_at: Optional[float] = None) -> None:
+        if h is None or url in self._hashes:
+            return
+        h &= MASK_64
+        self._hashes[url] = h
+        self._order.append((seen_at or time.time(), url))
+        for table, key in zip(self._tables, self._keys(h)):
+            table.setdefault(key, set()).add(url)
+
+    def _remove(self, url: str) -> None:
+        h = self._hashes.pop(url, None)
+        if h is None:
+            return
+        for table, key in zip(self._tables, self._keys(h)):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(url)
+                if not bucket:
+                    del table[key]
+
+    def expire(self) -> None:
+        cutoff = time.time() - self.ttl_s
+        while self._order and self._order[0][0] < cutoff:
+            self._remove(self._order.popleft()[1])
+
+    def nearest(self, h: int, max_distance: Optional[int] = None) -> Optional[Tuple[str, int]]:
+        """(url, distance) of the closest stored hash within max_distance, or None."""
+        k = self.max_distance if max_distance is None else max_distance
+        if k > self.max_distance:
+            raise ValueError(f"index built for distance <= {self.max_distance}, got {k}")
+        self.expire()
+        h &= MASK_64
+        candidates: Set[str] = set()
+        for table, key in zip(self._tables, self._keys(h)):
+            candidates |= table.get(key, set())
+        self.stats["lookups"] += 1
+        self.stats["candidates"] += len(candidates)
+
+        best = None
+        for url in candidates:
+            dist = hamming_distance(self._hashes[url], h)
+            if dist <= k and (best is None or dist < best[1]):
+                best = (url, dist)
+        if best:
+            self.stats["hits"] += 1
+        return best
+
+
+simhash_index = SimHashIndex()
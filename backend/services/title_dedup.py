@@ -0,0 +1,206 @@
+# services/title_dedup.py
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from backend.db.models import Article
+from backend.db.session import AsyncSessionLocal
+from backend.services import article_extraction
+from backend.services.fetch_limiter import domain_of
+from backend.services.url_index import canonicalize_url
+from backend.utils.helpers import utcnow
+
+# Estimated Jaccard similarity of title shingles above which two titles are the same story.
+TITLE_DEDUP_THRESHOLD = float(os.getenv("TITLE_DEDUP_THRESHOLD", "0.6"))
+# How far back listing titles are remembered.
+TITLE_DEDUP_DAYS = float(os.getenv("TITLE_DEDUP_DAYS", "2"))
+# "skip" drops duplicates before crawling, "deprioritize" crawls them after everything else.
+TITLE_DEDUP_MODE = os.getenv("TITLE_DEDUP_MODE", "skip")
+# In "deprioritize" mode at most this many duplicates per listing are crawled; the rest
+# are dropped as in "skip" (a deferred crawl still costs a crawl and the LLM calls).
+TITLE_DEDUP_LATER_MAX = int(os.getenv("TITLE_DEDUP_LATER_MAX", "3"))
+SKIP = "skip"
+DEPRIORITIZE = "deprioritize"
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows: candidate pairs from roughly 0.5 Jaccard up
+ROWS = NUM_PERM // BANDS
+_PRIME = np.uint64(4294967291)  # largest prime below 2**32
+
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "at", "by", "with", "as",
+    "is", "are", "was", "be", "its", "it", "from", "after", "over", "says", "say", "said",
+    "amid", "into", "up", "down", "new", "update", "updated", "exclusive", "live", "video",
+}
+_rng = np.random.default_rng(1337)
+_A = _rng.integers(1, int(_PRIME), NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, int(_PRIME), NUM_PERM, dtype=np.uint64)
+
+
+def title_tokens(title: str) -> List[str]:
+    words = re.findall(r"[a-z0-9$%.]+", (title or "").lower())
+    return [w.strip(".") for w in words if w.strip(".") and w.strip(".") not in _STOPWORDS]
+
+
+def shingles(title: str) -> Set[str]:
+    """Word bigrams plus unigrams, so short headlines still get a usable signature."""
+    tokens = title_tokens(title)
+    return set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+def minhash(title: str) -> Optional[np.ndarray]:
+    sh = shingles(title)
+    if not sh:
+        return None
+    x = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little") for s in sh),
+        dtype=np.uint64,
+        count=len(sh),
+    )
+    # (a*x + b) mod p for every permutation; both terms stay below 2**64.
+    hashed = ((_A[:, None] * x[None, :]) % _PRIME + _B[:, None]) % _PRIME
+    return hashed.min(axis=1)
+
+
+@dataclass
+class _Entry:
+    url: str
+    domain: str
+    title: str
+    sig: np.ndarray
+    seen_at: float
+
+
+class TitleIndex:
+    """
+    MinHash LSH over listing titles of the last TITLE_DEDUP_DAYS days.
+
+    Catches the same wire story syndicated on several sources (different URLs)
+    before anything is crawled or sent to the LLM. Only stored articles are
+    added (see node_insert), and only titles from other domains match, so an
+    outlet's templated headlines do not hide its own later stories.
+    """
+
+    def __init__(self, threshold: float = TITLE_DEDUP_THRESHOLD, days: float = TITLE_DEDUP_DAYS):
+        self.threshold = threshold
+        self.ttl_s = days * 86400
+        self._entries: Dict[int, _Entry] = {}
+        self._order: Deque[int] = deque()
+        self._bands: List[Dict[bytes, Set[int]]] = [{} for _ in range(BANDS)]
+        self._by_url: Dict[str, int] = {}
+        self._next_id = 0
+        self._warmed = False
+        self.stats = {"checked": 0, "duplicates": 0, "crawls_saved": 0, "llm_calls_saved_est": 0.0}
+
+    async def warm(self) -> None:
+        cutoff = utcnow() - timedelta(seconds=self.ttl_s)
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(
+                select(Article.url, Article.title, Article.fetched_at)
+                .where(Article.fetched_at >= cutoff)
+                .order_by(Article.fetched_at)
+            )
+            async for url, title, fetched_at in result:
+                self.add(url, title, fetched_at.timestamp())
+        self._warmed = True
+        print(f"Title index warmed with {len(self._entries)} titles")
+
+    async def ensure_warm(self) -> None:
+        if not self._warmed:
+            await self.warm()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---------- Index ----------
+    @staticmethod
+    def _band_keys(sig: np.ndarray) -> List[bytes]:
+        return [sig[i * ROWS:(i + 1) * ROWS].tobytes() for i in range(BANDS)]
+
+    def add(self, url: str, title: str, seen_at: Optional[float] = None) -> None:
+        canon = canonicalize_url(url)
+        sig = minhash(title)
+        if sig is None or canon in self._by_url:
+            return
+        eid = self._next_id
+        self._next_id += 1
+        self._entries[eid] = _Entry(canon, domain_of(canon), title, sig, seen_at or time.time())
+        self._order.append(eid)
+        self._by_url[canon] = eid
+        for band, key in zip(self._bands, self._band_keys(sig)):
+            band.setdefault(key, set()).add(eid)
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl_s
+        while self._order and self._entries[self._order[0]].seen_at < cutoff:
+            eid = self._order.popleft()
+            entry = self._entries.pop(eid)
+            self._by_url.pop(entry.url, None)
+            for band, key in zip(self._bands, self._band_keys(entry.sig)):
+                bucket = band.get(key)
+                if bucket is not None:
+                    bucket.discard(eid)
+                    if not bucket:
+                        del band[key]
+
+    def match(self, url: str, title: str) -> Optional[Tuple[str, float]]:
+        """(url, similarity) of an earlier title of the same story from another source."""
+        sig = minhash(title)
+        if sig is None:
+            return None
+        canon = canonicalize_url(url)
+        domain = domain_of(canon)
+        candidates: Set[int] = set()
+        for band, key in zip(self._bands, self._band_keys(sig)):
+            candidates |= band.get(key, set())
+        best = None
+        for eid in candidates:
+            entry = self._entries[eid]
+            if entry.url == canon or entry.domain == domain:
+                continue
+            sim = float(np.mean(entry.sig == sig))
+            if sim >= self.threshold and (best is None or sim > best[1]):
+                best = (entry.url, sim)
+        return best
+
+    # ---------- Listing filter ----------
+    async def filter(self, articles: List[dict], mode: str = TITLE_DEDUP_MODE) -> Tuple[List[dict], List[dict]]:
+        """
+        Split listing entries into (crawl now, crawl later). In "skip" mode the
+        second list is always empty and duplicates are dropped; "deprioritize" keeps
+        the first TITLE_DEDUP_LATER_MAX of them for later and drops the rest.
+        """
+        await self.ensure_warm()
+        self._expire()
+        fresh, dupes = [], []
+        for a in articles:
+            link, title = a.get("link") or "", a.get("title") or ""
+            hit = self.match(link, title)
+            if hit:
+                dupes.append(a)
+                print(f"TitleIndex: '{title}' looks like {hit[0]} (~{hit[1]:.2f})")
+            else:
+                fresh.append(a)
+
+        self.stats["checked"] += len(articles)
+        self.stats["duplicates"] += len(dupes)
+        later = dupes[:TITLE_DEDUP_LATER_MAX] if mode == DEPRIORITIZE else []
+        dropped = len(dupes) - len(later)
+        self.stats["crawls_saved"] += dropped
+        # An estimate: normalize_article always calls the LLM, parsed_struct_text only on
+        # extraction fallback, so each dropped crawl saves 1 + the fallback rate on average.
+        self.stats["llm_calls_saved_est"] += dropped * (1 + article_extraction.fallback_rate())
+        return fresh, later
+
+
+title_index = TitleIndex()
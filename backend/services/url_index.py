@@ -0,0 +1,89 @@
+# services/url_index.py
+from __future__ import annotations
+
+from typing import Iterable, List, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from sqlalchemy import select
+
+from backend.db.models import Article
+from backend.db.session import AsyncSessionLocal
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "_hsenc", "_hsmi",
+    "ref", "ref_src", "cmpid", "__source", "source", ".tsrc", "tsrc", "ncid", "soc_src",
+    "soc_trk", "guccounter", "guce_referrer", "guce_referrer_sig", "taid", "yptr", "ftcamp",
+}
+TRACKING_PREFIXES = ("utm_", "at_", "ga_")
+
+
+def canonicalize_url(url: str) -> str:
+    """Stable form of an article URL: https, bare lowercase host, no tracking params or fragment."""
+    parts = urlsplit((url or "").strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    query = [
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+
+class UrlIndex:
+    """In-memory set of canonical URLs already stored in `articles`."""
+
+    def __init__(self):
+        self._urls: Set[str] = set()
+        self._warmed = False
+        self.stats = {"checked": 0, "skipped": 0}
+
+    async def warm(self) -> None:
+        async with AsyncSessionLocal() as session:
+            result = await session.stream_scalars(select(Article.url))
+            async for url in result:
+                self._urls.add(canonicalize_url(url))
+        self._warmed = True
+        print(f"URL index warmed with {len(self._urls)} urls")
+
+    async def ensure_warm(self) -> None:
+        if not self._warmed:
+            await self.warm()
+
+    def __contains__(self, url: str) -> bool:
+        return canonicalize_url(url) in self._urls
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def add(self, url: str) -> None:
+        if url:
+            self._urls.add(canonicalize_url(url))
+
+    def add_many(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            self.add(url)
+
+    async def filter_new(self, articles: List[dict], key: str = "link") -> List[dict]:
+        """Drop listing entries whose URL is already ingested (or repeated within the listing)."""
+        await self.ensure_warm()
+        fresh, seen = [], set()
+        for a in articles:
+            canon = canonicalize_url(a.get(key) or "")
+            if canon in self._urls or canon in seen:
+                continue
+            seen.add(canon)
+            fresh.append(a)
+        self.stats["checked"] += len(articles)
+        self.stats["skipped"] += len(articles) - len(fresh)
+        return fresh
+
+
+url_index = UrlIndex()
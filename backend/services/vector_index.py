@@ -0,0 +1,164 @@
+# services/vector_index.py
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from backend.db.models import Article
+from backend.db.session import AsyncSessionLocal
+from backend.services.dedup import LOOKBACK_DAYS
+from backend.utils.helpers import utcnow
+
+VECTOR_INDEX_ENABLED = os.getenv("VECTOR_INDEX_ENABLED", "1") == "1"
+# Days of embeddings kept in memory; also the window for related-article lookups.
+VECTOR_INDEX_DAYS = float(os.getenv("VECTOR_INDEX_DAYS", str(max(LOOKBACK_DAYS, 14))))
+# float16 halves memory at a small precision cost.
+VECTOR_INDEX_DTYPE = np.dtype(os.getenv("VECTOR_INDEX_DTYPE", "float32"))
+DIM = 1536
+
+_META_KEYS = ("url", "title", "summary", "published_at", "source_domain")
+
+
+class VectorIndex:
+    """
+    Exact cosine search over recent `articles.content_emb` held in one NumPy matrix.
+
+    Rows are L2-normalised so a query is a single matrix-vector product. Until
+    `warm()` has finished the index reports itself cold and callers use pgvector;
+    the process entry point starts it with `kick_warm()`. Rows older than the TTL
+    are ignored by queries and compacted away when the matrix fills up.
+    """
+
+    def __init__(self, days: float = VECTOR_INDEX_DAYS, dtype: np.dtype = VECTOR_INDEX_DTYPE):
+        self.ttl_s = days * 86400
+        self.dtype = dtype
+        self._mat = np.zeros((1024, DIM), dtype=dtype)
+        self._ts = np.zeros(1024, dtype=np.float64)
+        self._meta: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._n = 0
+        self._warmed = False
+        self._warming: Optional[asyncio.Task] = None
+        self.stats = {"top1": 0, "topk": 0}
+
+    # ---------- Warm-up ----------
+    async def warm(self) -> None:
+        cutoff = utcnow() - timedelta(seconds=self.ttl_s)
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(
+                select(
+                    Article.url,
+                    Article.title,
+                    Article.summary,
+                    Article.published_at,
+                    Article.source_domain,
+                    Article.fetched_at,
+                    Article.content_emb,
+                )
+                .where(Article.fetched_at >= cutoff, Article.content_emb.isnot(None))
+                .order_by(Article.fetched_at)
+            )
+            async for row in result:
+                meta = dict(zip(_META_KEYS, row[:5]))
+                self.add(row.url, row.content_emb, meta, row.fetched_at.timestamp())
+        self._warmed = True
+        print(f"Vector index warmed with {self._n} embeddings")
+
+    def kick_warm(self) -> None:
+        """Start warming in the background (scripts that never ran before_serving)."""
+        if self._warmed or not VECTOR_INDEX_ENABLED:
+            return
+        if self._warming is None or self._warming.done():
+            self._warming = asyncio.create_task(self._warm_quietly())
+
+    async def _warm_quietly(self) -> None:
+        try:
+            await self.warm()
+        except Exception as e:
+            print(f"Vector index: warm-up failed, staying on pgvector: {e}")
+
+    @property
+    def ready(self) -> bool:
+        return self._warmed
+
+    def __len__(self) -> int:
+        return self._n
+
+    # ---------- Updates ----------
+    def add(self, url: str, emb: Optional[Sequence[float]], meta: Optional[Dict[str, Any]] = None,
+            seen_at: Optional[float] = None) -> None:
+        if not VECTOR_INDEX_ENABLED or emb is None or url in self._rows:
+            return
+        vec = np.asarray(emb, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        if vec.shape != (DIM,) or norm == 0.0:
+            return
+        if self._n == len(self._mat):
+            self._expire()
+        if self._n == len(self._mat):
+            self._mat = np.concatenate([self._mat, np.zeros_like(self._mat)])
+            self._ts = np.concatenate([self._ts, np.zeros_like(self._ts)])
+        self._mat[self._n] = vec / norm
+        self._ts[self._n] = seen_at or time.time()
+        self._meta.append({k: (meta or {}).get(k) for k in _META_KEYS} | {"url": url})
+        self._rows[url] = self._n
+        self._n += 1
+
+    def _expire(self) -> None:
+        keep = self._ts[: self._n] >= time.time() - self.ttl_s
+        if keep.all():
+            return
+        idx = np.flatnonzero(keep)
+        m = len(idx)
+        self._mat[:m] = self._mat[idx]
+        self._ts[:m] = self._ts[idx]
+        self._meta = [self._meta[i] for i in idx]
+        self._rows = {meta["url"]: i for i, meta in enumerate(self._meta)}
+        self._n = m
+
+    def vector(self, url: str) -> Optional[np.ndarray]:
+        row = self._rows.get(url)
+        return None if row is None else self._mat[row].astype(np.float32)
+
+    # ---------- Queries ----------
+    def _scores(self, emb: Sequence[float], since: Optional[float] = None) -> np.ndarray:
+        q = np.asarray(emb, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+        scores = (self._mat[: self._n] @ q.astype(self.dtype)).astype(np.float32)
+        # Expired rows stay in the matrix until the next compaction; never return them.
+        cutoff = time.time() - self.ttl_s
+        scores[self._ts[: self._n] < max(cutoff, since or cutoff)] = -np.inf
+        return scores
+
+    def top1(self, emb: Sequence[float], since: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """Most similar stored article (optionally only those seen after `since`)."""
+        self.stats["top1"] += 1
+        if self._n == 0:
+            return None
+        scores = self._scores(emb, since)
+        i = int(np.argmax(scores))
+        if not np.isfinite(scores[i]):
+            return None
+        return self._meta[i]["url"], float(scores[i])
+
+    def topk(self, emb: Sequence[float], k: int, exclude_url: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Metadata of the k most similar stored articles, best first."""
+        self.stats["topk"] += 1
+        if self._n == 0:
+            return []
+        scores = self._scores(emb)
+        if exclude_url in self._rows:
+            scores[self._rows[exclude_url]] = -np.inf
+        k = min(k, self._n)
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx])]
+        return [dict(self._meta[i]) for i in idx if np.isfinite(scores[i])]
+
+
+vector_index = VectorIndex()
@@ -1,17 +1,36 @@
 # services/verify_output.py
 from __future__ import annotations
-from typing import List, Dict, Any
+import os
+import re
+from difflib import SequenceMatcher
+from typing import List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 
+from backend.services.llm import chat_model, llm
+from backend.services.llm_cache import cache_spec
+
+
+# Set to 0 to send every packet to the LLM checker.
+LOCAL_VERIFY_ENABLED = os.getenv("LOCAL_VERIFY_ENABLED", "1") == "1"
+# difflib ratio at which a company name counts as present in the sources.
+COMPANY_MATCH_RATIO = float(os.getenv("COMPANY_MATCH_RATIO", "0.85"))
+
 
 class VerificationResult(BaseModel):
     ok: bool
     issues: List[str] = []
 
 
-_checker = ChatOpenAI(model="gpt-4o", temperature=0)
+stats = {"local": 0, "llm": 0}
+
+
+def llm_share() -> float:
+    total = stats["local"] + stats["llm"]
+    return stats["llm"] / total if total else 0.0
+
+
+_checker = chat_model("gpt-4o", temperature=0)
 
 verify_prompt = ChatPromptTemplate.from_messages(
     [
@@ -25,6 +44,9 @@ Flag if:
 - causal claims not supported by text
 - incorrect entity names or dates
 Sources are authoritative; do not add new info.
+An automatic check could not match these claims; look at them first:
+{unmatched}
+
 SOURCES:
 {sources_text}
 
@@ -36,6 +58,142 @@ PACKET:
 )
 
 
-def verify_packet(sources_text: str, packet_json: Dict[str, Any]) -> VerificationResult:
+_cache = cache_spec("verify", verify_prompt, _checker)
+
+
+# ---------- Deterministic pre-check ----------
+_NUMBER = re.compile(
+    r"(?<![\w.])[-+]?\$?(\d{1,3}(?:,\d{3})+|\d+)(?:\.(\d+))?"
+    r"\s?(%|percent|trillion|tn|billion|bn|million|mn|m\b|k\b|bps|basis points)?",
+    re.IGNORECASE,
+)
+_SCALE = {"trillion": 1e12, "tn": 1e12, "billion": 1e9, "bn": 1e9, "million": 1e6, "mn": 1e6, "m": 1e6, "k": 1e3}
+_CAUSAL = re.compile(
+    r"\b(because|due to|driven by|as a result|result(?:ed|ing)? (?:of|in)|led to|leading to|caused|"
+    r"owing to|thanks to|on the back of|triggered|spurred|fuell?ed by|weighed on)\b",
+    re.IGNORECASE,
+)
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z0-9]+(?:[.'-][a-z0-9]+)*")
+_COMPANY_SUFFIX = re.compile(
+    r"[,.]?\s+(inc|corp|corporation|co|ltd|plc|ag|sa|se|nv|group|holdings?|company)\.?$", re.IGNORECASE
+)
+
+
+def extract_numbers(text: str) -> List[Tuple[str, float, float, float]]:
+    """(literal, raw value, scaled value, rounding tolerance of the raw value) per number."""
+    out = []
+    for m in _NUMBER.finditer(text):
+        whole, frac, unit = m.group(1), m.group(2), (m.group(3) or "").lower()
+        raw = float(whole.replace(",", "") + (f".{frac}" if frac else ""))
+        tol = 0.5 * 10 ** -(len(frac) if frac else 0)
+        out.append((m.group(0).strip(), raw, raw * _SCALE.get(unit, 1.0), tol))
+    return out
+
+
+def number_supported(claim: Tuple[str, float, float, float], source_values: List[Tuple[float, float]]) -> bool:
+    _, raw, scaled, tol = claim
+    factor = scaled / raw if raw else 1.0
+    for s_raw, s_scaled in source_values:
+        if abs(raw - s_raw) <= max(tol, 0.005 * abs(s_raw)):
+            return True
+        if abs(scaled - s_scaled) <= max(tol * factor, 0.005 * abs(s_scaled)):
+            return True
+    return False
+
+
+def _numeric_supported(value: Any, source_values: List[Tuple[float, float]]) -> bool:
+    # numerics may be stored as fractions (0.12) for percentages (12%) or the other way round.
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return True
+    for v in (float(value), float(value) * 100, float(value) / 100):
+        if number_supported((str(value), v, v, 0.005 * abs(v) or 0.005), source_values):
+            return True
+    return False
+
+
+def _company_supported(name: str, source_lower: str, source_words: List[str]) -> bool:
+    name = _COMPANY_SUFFIX.sub("", name.strip()).lower()
+    if not name or name in source_lower:
+        return True
+    tokens = _WORD.findall(name)
+    n = len(tokens)
+    if n == 0:
+        return True
+    target = " ".join(tokens)
+    for i in range(len(source_words) - n + 1):
+        if SequenceMatcher(None, target, " ".join(source_words[i: i + n])).ratio() >= COMPANY_MATCH_RATIO:
+            return True
+    return False
+
+
+def _causal_supported(sentence: str, source_lower: str, source_words: set) -> bool:
+    # A causal claim passes only if the sources use causal wording too and share most of its content.
+    if not _CAUSAL.search(source_lower):
+        return False
+    content = [w for w in _WORD.findall(sentence.lower()) if len(w) > 3]
+    return bool(content) and sum(w in source_words for w in content) / len(content) >= 0.7
+
+
+def pre_verify(sources_text: str, packet_json: Dict[str, Any]) -> List[str]:
+    """
+    Mechanical check of the packet against the sources: numbers, tickers and company
+    names must appear there, and causal sentences need close support. Returns the
+    claims it could not match; an empty list means the packet is verified.
+    """
+    extracted = packet_json.get("extracted", {})
+    packet = packet_json.get("packet", {})
+    narrative = [packet.get("executive_summary", "")] + list(packet.get("bullets", []))
+    written = narrative + list(packet.get("actions", [])) + list(packet.get("risks", []))
+
+    source_lower = sources_text.lower()
+    source_word_list = _WORD.findall(source_lower)
+    source_words = set(source_word_list)
+    source_values = [(raw, scaled) for _, raw, scaled, _ in extract_numbers(sources_text)]
+
+    unmatched = []
+    for text in written:
+        for claim in extract_numbers(text):
+            if not number_supported(claim, source_values):
+                unmatched.append(f"number {claim[0]!r} in: {text}")
+    for label, value in (extracted.get("numerics") or {}).items():
+        if not _numeric_supported(value, source_values):
+            unmatched.append(f"numeric {label}={value}")
+    for ticker in extracted.get("tickers", []):
+        if not re.search(rf"\b{re.escape(ticker)}\b", sources_text):
+            unmatched.append(f"ticker {ticker}")
+    for company in extracted.get("companies", []):
+        if not _company_supported(company, source_lower, source_word_list):
+            unmatched.append(f"company {company}")
+    # Actions and risks are forward-looking by design; only the narrative makes factual causal claims.
+    for text in narrative:
+        for sentence in _SENTENCE.split(text):
+            if _CAUSAL.search(sentence) and not _causal_supported(sentence, source_lower, source_words):
+                unmatched.append(f"causal claim: {sentence}")
+    return unmatched
+
+
+async def verify_packet(sources_text: str, packet_json: Dict[str, Any]) -> VerificationResult:
+    unmatched = pre_verify(sources_text, packet_json) if LOCAL_VERIFY_ENABLED else ["(local check disabled)"]
+    if not unmatched:
+        stats["local"] += 1
+        return VerificationResult(ok=True, issues=[])
+
+    stats["llm"] += 1
+    print(f"verify_packet: {len(unmatched)} unmatched claim(s), asking the LLM ({llm_share():.0%} of packets so far)")
     chain = verify_prompt | _checker.with_structured_output(VerificationResult)
-    return chain.invoke({"sources_text": sources_text, "packet_text": str(packet_json)})
+    inputs = {
+        "sources_text": sources_text,
+        "packet_text": str(packet_json),
+        "unmatched": "\n".join(f"- {u}" for u in unmatched),
+    }
+    # The blended impact_score drifts with recency and is not something the checker verifies.
+    impact = {k: v for k, v in (packet_json.get("impact") or {}).items() if k != "impact_score"}
+    stable = {**packet_json, "impact": impact, "importance": None}
+    return await llm.ainvoke(
+        chain,
+        inputs,
+        name="verify",
+        cache=_cache,
+        cache_input={**inputs, "packet_text": str(stable)},
+    )